@@ -0,0 +1,496 @@
+"""
+Synthetic instances and scaling benchmarks for the scheduler.
+
+    python benchmark.py generate --subjects 200 --output synthetic.xlsx
+    python benchmark.py run --tiers small medium large --output results.jsonl
+    python benchmark.py run --tiers small --compare results.jsonl
+    python benchmark.py islands --subjects 6 --islands 4
+    python benchmark.py operators --subjects 40 --seeds 0 1 2
+    python benchmark.py engines --tiers small medium --time-limit 20
+    python benchmark.py workers --tier large --workers 1 2 4 8
+
+Every tier runs in a fresh process, so its peak RSS is its own. Results are written as
+one JSON object per tier and line; --compare checks them against an earlier results file.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import pandas as pd
+from openpyxl import Workbook
+
+import scheduler
+
+# Subjects per size tier
+tiers = {"small": 40, "medium": 150, "large": 400, "xlarge": 1000}
+
+# Venues of each type per subject, and the capacities they cycle through
+default_venue_mix = {"Lecture Hall": 0.15, "Tutorial Room": 0.35, "Lab": 0.25}
+venue_capacity_choices = {"Lecture Hall": [200, 300, 400], "Tutorial Room": [40, 50], "Lab": [40, 45]}
+default_majors = ("CS", "IT", "SE", "DS")
+
+# Variation operators compared by `benchmark.py operators`: (mate, mutate, mutation indpb)
+operator_sets = {
+    "shuffle": (scheduler.cx_two_point, scheduler.mut_shuffle_indexes, 0.2),
+    "feasible": (scheduler.cx_two_point_repair, scheduler.mut_reassign, 0.05),
+}
+
+# Benchmarks run their full budget: the scheduler's stop at the first hard-feasible schedule would
+# make timings and penalties depend on when that happens
+full_budget = dict(stop_when_feasible=False)
+
+# Metrics where a larger value is better; every other compared metric is a duration
+throughput_metrics = ("inits_per_s", "evals_per_s", "batch_evals_per_s")
+compared_metrics = ("load_s", "expand_s") + throughput_metrics
+
+# ---------------------- Instance Generator ----------------------
+def generate_instance(n_subjects=40, students=(30, 320), venue_mix=None, majors=default_majors,
+                      lecturers_per_subject=2.0, seed=0):
+    """ Random Subject, Venue and Lecturer tables shaped like the ones load_inputs() returns.
+
+    students is the (min, max) enrolment of a subject; venue_mix maps each venue type to the
+    number of venues of that type per subject. Lecturers are spread evenly over the majors.
+    """
+    rnd = random.Random(seed)
+    venue_mix = default_venue_mix if venue_mix is None else venue_mix
+
+    subjects = []
+    for i in range(n_subjects):
+        subjects.append({
+            "SubjectID": f"S{i:04d}",
+            "SubjectName": f"Subject {i}",
+            "Major": majors[i % len(majors)],
+            "NoStudent": rnd.randint(*students),
+            "Lecture": rnd.choice([2, 3]),
+            "Tutorial": rnd.choice([1, 2, None]),
+            "Lab": rnd.choice([2, None]),
+        })
+    df_subjects = pd.DataFrame(subjects, columns=["SubjectID", "SubjectName", "Major", "NoStudent",
+                                                  "Lecture", "Tutorial", "Lab"])
+
+    venues = []
+    prefixes = {"Lecture Hall": "LH", "Tutorial Room": "TR", "Lab": "LB"}
+    for venue_type, per_subject in venue_mix.items():
+        capacities = venue_capacity_choices.get(venue_type, [50])
+        for i in range(max(2, math.ceil(n_subjects * per_subject))):
+            # Capacities cycle through the choices, so every size is there even for few venues
+            venues.append((f"{prefixes.get(venue_type, 'V')}{i}", venue_type, capacities[i % len(capacities)]))
+    df_venues = pd.DataFrame(venues, columns=["Venue", "Type", "Capacity"])
+
+    n_lecturers = max(2 * len(majors), math.ceil(n_subjects * lecturers_per_subject))
+    df_lecturers = pd.DataFrame(
+        [(f"L{i:04d}", f"Lecturer {i}", majors[i % len(majors)]) for i in range(n_lecturers)],
+        columns=["LecturerID", "LecturerName", "Major"],
+    )
+    return df_subjects, df_venues, df_lecturers
+
+def write_instance(tables, path):
+    """ Saves generated tables as an input workbook with Subject, Venue and Lecturer sheets. """
+    wb = Workbook(write_only=True)
+    for name, df in zip(scheduler.input_sheets, tables):
+        ws = wb.create_sheet(name)
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            ws.append([None if pd.isna(value) else value for value in row])
+    wb.save(path)
+
+# ---------------------- Benchmark ----------------------
+def peak_rss_mib():
+    """ Peak resident set size of this process in MiB, or None when the platform cannot tell. """
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def throughput(run_pass, count, min_seconds=0.2):
+    """ Items per second of run_pass(), which handles count items, repeated for at least min_seconds. """
+    passes = 0
+    start = time.perf_counter()
+    while True:
+        run_pass()
+        passes += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return count * passes / elapsed
+
+def run_tier(tier, n_subjects, population=100, generations=30, seed=0):
+    """ Generates one instance and times every stage of the scheduler on it. """
+    random.seed(seed)
+    result = {"tier": tier, "subjects": n_subjects, "population": population,
+              "generations": generations, "seed": seed}
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "synthetic.xlsx")
+        write_instance(generate_instance(n_subjects, seed=seed), path)
+        start = time.perf_counter()
+        df_subjects, df_venues, df_lecturers = scheduler.load_inputs(path, use_cache=False)
+        result["load_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    result["expand_s"] = time.perf_counter() - start
+    result["sessions"] = len(scheduler.expanded_subjects)
+
+    individuals = scheduler.toolbox.population(n=population)
+    result["inits_per_s"] = throughput(lambda: scheduler.toolbox.population(n=population), population)
+    result["evals_per_s"] = throughput(lambda: [scheduler.evaluate(ind) for ind in individuals], population)
+    result["batch_evals_per_s"] = throughput(lambda: scheduler.evaluate_population(individuals), population)
+
+    # Best penalty after every generation, against the wall-clock time since the GA started
+    trace = []
+    def progress(gen, pop):
+        best = min(ind.fitness.values[0] for ind in pop)
+        trace.append([round(time.perf_counter() - start, 4), gen, best])
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep the logbook out of the results
+        best = scheduler.run_ga(n=population, ngen=generations, progress=progress, **full_budget)
+    result["ga_s"] = time.perf_counter() - start
+    result["best_penalty"] = scheduler.evaluate(best)[0]
+    result["penalty_trace"] = trace
+    result["peak_rss_mib"] = peak_rss_mib()
+    return result
+
+def run_tiers(tier_names, population=100, generations=30, seed=0):
+    """ Runs every tier in its own fresh process and yields the results in order. """
+    context = multiprocessing.get_context("spawn")
+    for tier in tier_names:
+        with context.Pool(1) as pool:
+            yield pool.apply(run_tier, (tier, tiers[tier], population, generations, seed))
+
+def compare_islands(n_subjects=6, islands=4, population=50, generations=200, interval=5, migrants=2,
+                    topology="ring", seed=0):
+    """ Time to a zero-penalty schedule with the island model and with one population of the same total
+    size, so both spend the same number of evaluations per generation.
+    """
+    random.seed(seed)
+    df_subjects, df_venues, df_lecturers = generate_instance(n_subjects, students=(30, 80), seed=seed)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+
+    runs = {
+        "single_population": lambda trace: scheduler.run_ga(n=islands * population, ngen=generations, trace=trace,
+                                                 verbose=False, **full_budget),
+        "island_model": lambda trace: scheduler.run_islands(islands, population, generations, interval, migrants,
+                                                       topology, seed, trace=trace, **full_budget),
+    }
+    result = {"subjects": n_subjects, "sessions": len(scheduler.expanded_subjects), "islands": islands,
+              "population": population, "generations": generations, "interval": interval,
+              "migrants": migrants, "topology": topology, "seed": seed}
+    for name, run in runs.items():
+        random.seed(seed)
+        trace = scheduler.RunTrace()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            best = run(trace)
+        seconds = time.perf_counter() - start
+        penalty = best.fitness.values[0]
+        result[name] = {
+            "seconds": seconds,
+            "evaluations": sum(entry["nevals"] for entry in trace.logbook),
+            "best_penalty": penalty,
+            "time_to_zero_s": seconds if penalty == 0 else None,
+        }
+    return result
+
+def compare_operators(n_subjects=40, population=100, generations=100, seed=0):
+    """ Evaluations until the population holds a schedule without hard-constraint violations, and the
+    share of hard-feasible schedules per generation, for every operator set on the same instance.
+    """
+    random.seed(seed)
+    df_subjects, df_venues, df_lecturers = generate_instance(n_subjects, seed=seed)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    result = {"subjects": n_subjects, "sessions": len(scheduler.expanded_subjects), "population": population,
+              "generations": generations, "seed": seed}
+
+    registered = scheduler.toolbox.mate, scheduler.toolbox.mutate
+    try:
+        for name, (mate, mutate, indpb) in operator_sets.items():
+            scheduler.toolbox.register("mate", mate)
+            scheduler.toolbox.register("mutate", mutate, indpb=indpb)
+            trace = scheduler.RunTrace()
+            evaluations, feasible_at, feasible_shares = 0, None, []
+
+            def progress(gen, pop):
+                nonlocal evaluations, feasible_at
+                evaluations += trace.logbook[-1]["nevals"]
+                counts = scheduler.population_evaluator.violations(pop)
+                feasible = sum(counts[kind] for kind in scheduler.hard_constraints) == 0
+                feasible_shares.append(float(feasible.mean()))
+                if feasible_at is None and feasible.any():
+                    feasible_at = evaluations
+
+            random.seed(seed)
+            start = time.perf_counter()
+            best = scheduler.run_ga(n=population, ngen=generations, trace=trace, progress=progress, verbose=False,
+                                    **full_budget)
+            result[name] = {
+                "evaluations_to_feasible": feasible_at,
+                "evaluations": evaluations,
+                "mean_feasible_share": sum(feasible_shares) / len(feasible_shares),
+                "best_penalty": best.fitness.values[0],
+                "seconds": time.perf_counter() - start,
+            }
+    finally:
+        scheduler.toolbox.register("mate", registered[0])
+        scheduler.toolbox.mutate = registered[1]
+    return result
+
+def compare_engines(tier, n_subjects, time_limit=20.0, population=100, seed=0):
+    """ GA against local search under the same wall-clock budget: the time until the best schedule
+    has no hard-constraint violations, the time until the final best was found, and its penalty.
+    """
+    random.seed(seed)
+    df_subjects, df_venues, df_lecturers = generate_instance(n_subjects, seed=seed)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    result = {"tier": tier, "subjects": n_subjects, "sessions": len(scheduler.expanded_subjects),
+              "time_limit": time_limit, "seed": seed}
+
+    engines = {
+        "ga": lambda trace, progress: scheduler.run_ga(n=population, ngen=10**9, time_limit=time_limit,
+                                                       trace=trace, progress=progress, verbose=False, **full_budget),
+        "local_search": lambda trace, progress: scheduler.run_local_search(max_moves=10**9, time_limit=time_limit,
+                                                                           log_every=500, trace=trace,
+                                                                           progress=progress, verbose=False,
+                                                                           **full_budget),
+    }
+    for name, run in engines.items():
+        trace = scheduler.RunTrace()
+        feasible_at, best_at, best_penalty = None, None, None
+
+        def progress(step, _):
+            nonlocal feasible_at, best_at, best_penalty
+            entry = trace.logbook[-1]
+            elapsed = time.perf_counter() - start
+            if feasible_at is None and all(entry[kind] == 0 for kind in scheduler.hard_constraints):
+                feasible_at = elapsed
+            if best_penalty is None or entry["best"] < best_penalty:
+                best_at, best_penalty = elapsed, entry["best"]
+
+        random.seed(seed)
+        start = time.perf_counter()
+        best = run(trace, progress)
+        result[name] = {
+            "seconds": time.perf_counter() - start,
+            "time_to_hard_feasible_s": feasible_at,
+            "time_to_best_s": best_at,
+            "best_penalty": best.fitness.values[0],
+        }
+    return result
+
+def compare_decomposition(tier, n_subjects, time_limit=20.0, engine="ga", population=100, seed=0):
+    """ One engine on the whole timetable against the same engine per venue pool (run_decomposed),
+    under the same wall-clock budget: final penalty and its hard-constraint violations.
+    """
+    random.seed(seed)
+    df_subjects, df_venues, df_lecturers = generate_instance(n_subjects, seed=seed)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    result = {"tier": tier, "subjects": n_subjects, "sessions": len(scheduler.expanded_subjects),
+              "pools": {name: len(indices) for name, indices in scheduler.venue_pools().items()},
+              "engine": engine, "time_limit": time_limit, "seed": seed}
+
+    if engine == "local-search":
+        options = dict(max_moves=10**9, time_limit=time_limit, **full_budget)
+        whole = lambda: scheduler.run_local_search(verbose=False, **options)
+    else:
+        options = dict(n=population, ngen=10**9, time_limit=time_limit, **full_budget)
+        whole = lambda: scheduler.run_ga(verbose=False, **options)
+    runs = {"whole": whole, "decomposed": lambda: scheduler.run_decomposed(engine, seed, **options)}
+    for name, run in runs.items():
+        random.seed(seed)
+        start = time.perf_counter()
+        best = run()
+        violations = scheduler.population_evaluator.violations([best])
+        result[name] = {
+            "seconds": time.perf_counter() - start,
+            "best_penalty": best.fitness.values[0],
+            "hard_violations": sum(int(violations[kind][0]) for kind in scheduler.hard_constraints),
+        }
+    return result
+
+def compare_workers(tier, n_subjects, workers=(1, 2, 4, 8), population=200, generations=10, seed=0):
+    """ Population evaluations per second and GA run time with the evaluation spread over each number
+    of pool processes (run_ga(workers=N)), and the speed-up of both against the first count.
+    """
+    random.seed(seed)
+    df_subjects, df_venues, df_lecturers = generate_instance(n_subjects, seed=seed)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    individuals = scheduler.toolbox.population(n=population)
+    result = {"tier": tier, "subjects": n_subjects, "sessions": len(scheduler.expanded_subjects),
+              "population": population, "generations": generations, "cpus": os.cpu_count(), "seed": seed}
+
+    for count in workers:
+        start = time.perf_counter()
+        pool = scheduler.start_pool(count) if count > 1 else None
+        pool_start_s = time.perf_counter() - start
+        try:
+            chunksize = -(-population // count)
+            evals_per_s = throughput(lambda: scheduler.evaluate_population(individuals, chunksize), population,
+                                     min_seconds=1.0)
+        finally:
+            if pool is not None:
+                scheduler.stop_pool(pool)
+
+        random.seed(seed)
+        start = time.perf_counter()
+        scheduler.run_ga(n=population, ngen=generations, workers=count, verbose=False, **full_budget)
+        result[f"workers_{count}"] = {"pool_start_s": pool_start_s, "evals_per_s": evals_per_s,
+                                      "ga_s": time.perf_counter() - start}
+
+    first = result[f"workers_{workers[0]}"]
+    for count in workers:
+        entry = result[f"workers_{count}"]
+        entry["evals_speedup"] = entry["evals_per_s"] / first["evals_per_s"]
+        entry["ga_speedup"] = first["ga_s"] / entry["ga_s"]
+    return result
+
+def compare(results, baseline, tolerance):
+    """ Lists the metrics that got worse than the baseline by more than tolerance (a fraction). """
+    regressions = []
+    for result in results:
+        before = baseline.get(result["tier"])
+        if before is None:
+            continue
+        for metric in compared_metrics:
+            old, new = before.get(metric), result.get(metric)
+            if not old or not new:
+                continue
+            slowdown = old / new if metric in throughput_metrics else new / old
+            if slowdown > 1 + tolerance:
+                regressions.append(f"{result['tier']}: {metric} {old:.4g} -> {new:.4g} ({slowdown:.2f}x worse)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic instances and scaling benchmarks for the scheduler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a synthetic input workbook")
+    generate.add_argument("--subjects", type=int, default=40)
+    generate.add_argument("--min-students", type=int, default=30)
+    generate.add_argument("--max-students", type=int, default=320)
+    generate.add_argument("--majors", nargs="+", default=list(default_majors))
+    generate.add_argument("--lecturers-per-subject", type=float, default=2.0)
+    for venue_type, per_subject in default_venue_mix.items():
+        option = "--" + venue_type.lower().replace(" ", "-") + "s-per-subject"
+        generate.add_argument(option, type=float, default=per_subject, dest=venue_type)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--output", default="synthetic.xlsx")
+
+    run = commands.add_parser("run", help="benchmark the scheduler across size tiers")
+    run.add_argument("--tiers", nargs="+", choices=list(tiers), default=["small", "medium"])
+    run.add_argument("--population", type=int, default=100)
+    run.add_argument("--generations", type=int, default=30)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--output", help="append the results to this JSON lines file")
+    run.add_argument("--compare", help="JSON lines results to check for regressions")
+    run.add_argument("--tolerance", type=float, default=0.25,
+                     help="allowed slowdown against --compare before failing (default: 0.25)")
+    islands = commands.add_parser("islands", help="time to a zero-penalty schedule, island model vs one population")
+    islands.add_argument("--subjects", type=int, default=6)
+    islands.add_argument("--islands", type=int, default=4)
+    islands.add_argument("--population", type=int, default=50, help="population of every island")
+    islands.add_argument("--generations", type=int, default=200)
+    islands.add_argument("--migration-interval", type=int, default=5)
+    islands.add_argument("--migrants", type=int, default=2)
+    islands.add_argument("--topology", choices=scheduler.island_topologies, default="ring")
+    islands.add_argument("--seeds", type=int, nargs="+", default=[0])
+    operators = commands.add_parser("operators", help="evaluations to a hard-feasible schedule per operator set")
+    operators.add_argument("--subjects", type=int, default=40)
+    operators.add_argument("--population", type=int, default=100)
+    operators.add_argument("--generations", type=int, default=100)
+    operators.add_argument("--seeds", type=int, nargs="+", default=[0])
+    engines = commands.add_parser("engines", help="GA against local search under the same time budget")
+    engines.add_argument("--tiers", nargs="+", choices=list(tiers), default=["small", "medium"])
+    engines.add_argument("--time-limit", type=float, default=20.0)
+    engines.add_argument("--seed", type=int, default=0)
+    decompose = commands.add_parser("decompose", help="whole timetable against one sub-timetable per venue pool")
+    decompose.add_argument("--tiers", nargs="+", choices=list(tiers), default=["medium", "large"])
+    decompose.add_argument("--engine", choices=("ga", "local-search"), default="ga")
+    decompose.add_argument("--time-limit", type=float, default=20.0)
+    decompose.add_argument("--seed", type=int, default=0)
+    workers = commands.add_parser("workers", help="evaluation and GA speed-up across process-pool sizes")
+    workers.add_argument("--tier", choices=list(tiers), default="large")
+    workers.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    workers.add_argument("--population", type=int, default=200)
+    workers.add_argument("--generations", type=int, default=10)
+    workers.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        venue_mix = {venue_type: getattr(args, venue_type) for venue_type in default_venue_mix}
+        tables = generate_instance(args.subjects, (args.min_students, args.max_students), venue_mix,
+                                   tuple(args.majors), args.lecturers_per_subject, args.seed)
+        write_instance(tables, args.output)
+        print(f"{args.output}: {len(tables[0])} subjects, {len(tables[1])} venues, {len(tables[2])} lecturers")
+        return 0
+
+    if args.command == "engines":
+        for tier in args.tiers:
+            print(json.dumps(compare_engines(tier, tiers[tier], args.time_limit, seed=args.seed)), flush=True)
+        return 0
+
+    if args.command == "workers":
+        print(json.dumps(compare_workers(args.tier, tiers[args.tier], args.workers, args.population,
+                                         args.generations, args.seed)), flush=True)
+        return 0
+
+    if args.command == "decompose":
+        for tier in args.tiers:
+            print(json.dumps(compare_decomposition(tier, tiers[tier], args.time_limit, args.engine, seed=args.seed)),
+                  flush=True)
+        return 0
+
+    if args.command == "operators":
+        for seed in args.seeds:
+            print(json.dumps(compare_operators(args.subjects, args.population, args.generations, seed)), flush=True)
+        return 0
+
+    if args.command == "islands":
+        for seed in args.seeds:
+            print(json.dumps(compare_islands(args.subjects, args.islands, args.population, args.generations,
+                                             args.migration_interval, args.migrants, args.topology, seed)),
+                  flush=True)
+        return 0
+
+    results = []
+    for result in run_tiers(args.tiers, args.population, args.generations, args.seed):
+        results.append(result)
+        print(json.dumps(result), flush=True)
+        if args.output:
+            with open(args.output, "a") as f:
+                f.write(json.dumps(result) + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {}
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    baseline[record["tier"]] = record  # The latest run of a tier wins
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,230 +1,517 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import pickle
+import queue
 import random
-import pandas as pd
+import socket
+import warnings
+import zlib
 import sys
 import os
+import time
+from bisect import bisect_left, insort
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from array import array
+from functools import lru_cache
+from io import BytesIO, StringIO
+from itertools import chain
+
+# ---------------------- Daemon Client ----------------------
+# Defined before the third-party imports below: with a daemon running, `scheduler.exe --submit`
+# needs nothing but the standard library and hands the job over at once
+daemon_port = 48620
+
+def submit_job(argv, port=daemon_port):
+    """ Sends a command line to the --serve daemon on localhost and prints its progress as it arrives.
+
+    Returns the job's final message ({"output": ...} or {"error": ...}), or None when no daemon listens.
+    """
+    try:
+        connection = socket.create_connection(("127.0.0.1", port), timeout=2)
+    except OSError:
+        return None
+    with connection:
+        connection.settimeout(None)
+        connection.sendall((json.dumps({"argv": argv, "cwd": os.getcwd()}) + "\n").encode())
+        for line in connection.makefile(encoding="utf-8"):
+            message = json.loads(line)
+            if "progress" in message:
+                print(message["progress"], flush=True)
+            elif "queued" in message:
+                if message["queued"]:
+                    print(f"Queued behind {message['queued']} job(s)", flush=True)
+            else:
+                return message
+    return {"error": "the daemon closed the connection before the job finished"}
+
+def client_main(argv):
+    """ --submit: runs the job on the daemon and opens its output as a local run would.
+
+    Returns the exit code, or None when no daemon is running and the job should run here instead.
+    """
+    client = argparse.ArgumentParser(add_help=False)
+    client.add_argument("--submit", action="store_true")
+    client.add_argument("--port", type=int, default=daemon_port)
+    options, job_argv = client.parse_known_args(argv)
+    result = submit_job(job_argv, options.port)
+    if result is None:
+        print(f"No scheduler daemon on port {options.port}; scheduling here", file=sys.stderr)
+        return None
+    if "error" in result:
+        print(f"Error: {result['error']}", file=sys.stderr)
+        return 1
+    print(f"Wrote {result['output']} (penalty {result['penalty']:g}) in {result['seconds']:.1f} s")
+    if "--headless" not in job_argv and hasattr(os, "startfile"):
+        os.startfile(result["output"])
+    return 0
+
+if __name__ == "__main__" and "--submit" in sys.argv[1:]:
+    exit_code = client_main(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+import numpy as np
+import pandas as pd
 from deap import base, creator, tools, algorithms
-from openpyxl import load_workbook
-from openpyxl.styles import Border, Side, Alignment
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.chart import BarChart, PieChart, Reference
+from openpyxl.chart.label import DataLabelList
+from openpyxl.drawing.image import Image
+from openpyxl.formatting.rule import ColorScaleRule
+from openpyxl.styles import Border, Side, Alignment, Font
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
-
-# Ensure script runs in the same directory as the Excel file
-script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))  # Get the directory of the executable
-os.chdir(script_dir)
-
-# Load Excel Data
-excel_path = os.path.join(script_dir, "test.xlsm")  # Absolute path to the Excel file
-wb = load_workbook(excel_path, data_only=True)
-
-# Load Subject Sheet
-ws_subject = wb["Subject"]
-df_subjects = pd.DataFrame(ws_subject.values)
-df_subjects.columns = df_subjects.iloc[0].str.strip()  # Ensure column names are stripped
-df_subjects = df_subjects[1:].reset_index(drop=True)   # Remove header row from data
-
-# Now create SubjectID -> SubjectName mapping
-subject_name_dict = df_subjects.set_index("SubjectID")["SubjectName"].to_dict()
-
-# Assuming 'NoStudent' column might have NaN values
-df_subjects["NoStudent"] = pd.to_numeric(df_subjects["NoStudent"], errors="coerce").fillna(0).astype(int)
-
-# Load Venue and Lecturer Sheets
-df_venues = pd.read_excel(excel_path, sheet_name="Venue")
-df_lecturers = pd.read_excel(excel_path, sheet_name="Lecturer", header=None)
-
-# Process Lecturer Sheet
-for index, row in df_lecturers.iterrows():
-    if "LecturerID" in row.values:
-        df_lecturers.columns = df_lecturers.iloc[index]
-        df_lecturers = df_lecturers[index+1:].reset_index(drop=True)
-        break
-df_lecturers.columns = df_lecturers.columns.str.strip()
-df_lecturers = df_lecturers.dropna(how="all").reset_index(drop=True)
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
 
 # Extract Data
 days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 times = list(range(11))  # Time slots from 0 to 10
 
-venue_dict = {
-    "Lecture": df_venues[df_venues["Type"] == "Lecture Hall"]["Venue"].tolist(),
-    "Tutorial": df_venues[df_venues["Type"] == "Tutorial Room"]["Venue"].tolist(),
-    "Lab": df_venues[df_venues["Type"] == "Lab"]["Venue"].tolist(),
-}
+# Classes must end at these hours (Friday keeps the 12 PM - 2 PM prayer break free)
+allowed_end_times = {day: [10, 12, 14, 16, 18] for day in days}
+allowed_end_times["Friday"] = [10, 12, 17, 19]
+
+# Session types and the venue type each one is held in
+session_types = ["Lecture", "Tutorial", "Lab"]
+venue_type_names = {"Lecture": "Lecture Hall", "Tutorial": "Tutorial Room", "Lab": "Lab"}
+
+# Problem data shared by the optimisation stages, installed by set_venues() and set_sessions()
+venue_dict = {}
+venue_capacities = {}
+venue_types = {}
+venue_names = []
+venue_code = {}
+feasibility_index = None
+expanded_subjects = None
+subject_lectures = {}
+population_evaluator = None
+
+# ---------------------- Input Loading ----------------------
+input_sheets = ("Subject", "Venue", "Lecturer")
+input_cache_version = 1  # Bump when the parsed tables change shape
+
+def read_sheets(excel_path):
+    """ Reads the rows of every input sheet in one read-only streaming pass over the workbook. """
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        return {name: list(wb[name].iter_rows(values_only=True)) for name in input_sheets}
+    finally:
+        wb.close()
+
+def parse_inputs(sheet_rows):
+    """ Builds the Subject, Venue and Lecturer DataFrames from the raw sheet rows. """
+    # Load Subject Sheet
+    df_subjects = pd.DataFrame(sheet_rows["Subject"])
+    df_subjects.columns = df_subjects.iloc[0].str.strip()  # Ensure column names are stripped
+    df_subjects = df_subjects[1:].reset_index(drop=True)   # Remove header row from data
+
+    # Assuming 'NoStudent' column might have NaN values
+    df_subjects["NoStudent"] = pd.to_numeric(df_subjects["NoStudent"], errors="coerce").fillna(0).astype(int)
+
+    # Venue Sheet: header on the first row
+    header, *rows = sheet_rows["Venue"]
+    df_venues = pd.DataFrame(rows, columns=header).dropna(how="all").reset_index(drop=True)
+
+    # Process Lecturer Sheet: the header row is the one holding "LecturerID"
+    lecturer_rows = sheet_rows["Lecturer"]
+    header_index = next((i for i, row in enumerate(lecturer_rows) if "LecturerID" in row), None)
+    if header_index is None:
+        df_lecturers = pd.DataFrame(lecturer_rows)
+    else:
+        df_lecturers = pd.DataFrame(lecturer_rows[header_index + 1:], columns=lecturer_rows[header_index])
+    df_lecturers.columns = df_lecturers.columns.str.strip()
+    df_lecturers = df_lecturers.dropna(how="all").reset_index(drop=True)
+
+    return df_subjects, df_venues, df_lecturers
+
+def input_cache_path(excel_path):
+    """ The parsed-input cache lives next to the workbook, e.g. .test.xlsm.cache.pkl """
+    folder, name = os.path.split(os.path.abspath(excel_path))
+    return os.path.join(folder, f".{name}.cache.pkl")
+
+def input_cache_key(excel_path):
+    """ Content hash of the workbook together with the sheets read from it. """
+    digest = hashlib.sha256()
+    with open(excel_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(repr((input_sheets, input_cache_version)).encode())
+    return digest.hexdigest()
+
+# Parsed tables by cache key, for a long-lived --serve daemon; the oldest go first
+loaded_inputs = {}
+loaded_inputs_limit = 8
+
+def remember_inputs(key, tables):
+    loaded_inputs.pop(key, None)
+    loaded_inputs[key] = tables
+    while len(loaded_inputs) > loaded_inputs_limit:
+        loaded_inputs.pop(next(iter(loaded_inputs)))
+    return tables
+
+def load_inputs(excel_path, use_cache=True):
+    """ Reads the Subject, Venue and Lecturer sheets of the input workbook into DataFrames.
+
+    Parsed tables are cached next to the workbook, keyed by its content hash, so an
+    unchanged workbook is not parsed again on the next run. This process also keeps the
+    tables of the last few workbooks in memory.
+    """
+    cache_path = input_cache_path(excel_path)
+    key = input_cache_key(excel_path) if use_cache else None
+    if use_cache and key in loaded_inputs:
+        return remember_inputs(key, loaded_inputs[key])
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached["key"] == key:
+                return remember_inputs(key, cached["tables"])
+        except Exception:
+            pass  # Unreadable or stale cache: parse the workbook again
 
-venue_capacities = df_venues.set_index("Venue")["Capacity"].to_dict()
-venue_types = df_venues.set_index("Venue")["Type"].to_dict()
-lecturer_dict = df_lecturers.set_index("LecturerID")["LecturerName"].to_dict()
-lecturers = list(lecturer_dict.keys())
+    tables = parse_inputs(read_sheets(excel_path))
 
-# Store venue and lecturer availability
-venue_schedule = {venue: [] for venue in sum(venue_dict.values(), [])}  # Initialize all venues as empty
-lecturer_subject_count = {lec: 0 for lec in lecturers}  
+    if use_cache:
+        try:
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump({"key": key, "tables": tables}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # A read-only folder just means no cache
+        remember_inputs(key, tables)
+    return tables
+
+def venue_tables(df_venues):
+    """ Returns (venue_dict, venue_capacities, venue_types) built from the Venue sheet. """
+    venues = {
+        session_type: df_venues[df_venues["Type"] == venue_type]["Venue"].tolist()
+        for session_type, venue_type in venue_type_names.items()
+    }
+    capacities = df_venues.set_index("Venue")["Capacity"].to_dict()
+    types = df_venues.set_index("Venue")["Type"].to_dict()
+    return venues, capacities, types
+
+# ---------------------- Feasibility Index ----------------------
+def hours_mask(start_slot, hours):
+    """ Bitmask of the time slots [start_slot, start_slot + hours). """
+    return ((1 << hours) - 1) << start_slot
+
+class VenueOccupancy:
+    """ Booked time slots per (venue, day) as integer bitmasks, so a clash check is a single AND. """
+
+    def __init__(self):
+        self.masks = {}
+        self.bookings = {}  # venue -> number of sessions booked
+
+    def is_free(self, venue, day, mask):
+        return not self.masks.get((venue, day), 0) & mask
+
+    def book(self, venue, day, mask):
+        self.masks[(venue, day)] = self.masks.get((venue, day), 0) | mask
+        self.bookings[venue] = self.bookings.get(venue, 0) + 1
+
+    def pick_free(self, venues, day, mask, probes=8):
+        """ A uniformly random venue among those free for the mask, or None.
+
+        A few random probes find one without scanning the whole list on a lightly booked day.
+        """
+        for _ in range(probes):
+            venue = random.choice(venues)
+            if self.is_free(venue, day, mask):
+                return venue
+        free_venues = [v for v in venues if self.is_free(v, day, mask)]
+        return random.choice(free_venues) if free_venues else None
+
+class FeasibilityIndex:
+    """ One-time lookup tables for placing sessions.
+
+    (session type, student count bucket) -> venues that can seat them, sorted by capacity,
+    and (day, hours) -> start slots that end at an allowed time.
+    """
+
+    def __init__(self, venues, capacities):
+        self.capacities = {}
+        self.fitting = {}
+        for session_type, names in venues.items():
+            ordered = sorted(names, key=lambda v: capacities.get(v, 0))
+            self.capacities[session_type] = [capacities.get(v, 0) for v in ordered]
+            # Bucket b holds every venue at or above the b-th smallest capacity
+            for bucket in range(len(ordered) + 1):
+                self.fitting[(session_type, bucket)] = ordered[bucket:]
+        self.slots = {}
+        self.day_slots = {}
+
+    def venues_for(self, session_type, student_count):
+        """ Venues of the session type with enough capacity, smallest first. """
+        bucket = bisect_left(self.capacities.get(session_type, []), student_count)
+        return self.fitting.get((session_type, bucket), [])
+
+    def start_slots(self, day, hours):
+        """ Start slots on the day for which a session of `hours` ends at an allowed time. """
+        if (day, hours) not in self.slots:
+            self.slots[(day, hours)] = [
+                end_time - hours - 8 for end_time in allowed_end_times[day]
+                if end_time - hours >= 8 and end_time - hours - 8 in times
+            ]
+        return self.slots[(day, hours)]
+
+    def start_times(self, hours):
+        """ Every (day, start slot) at which a session of `hours` may start. """
+        if hours not in self.day_slots:
+            self.day_slots[hours] = [(day, time) for day in days for time in self.start_slots(day, hours)]
+        return self.day_slots[hours]
+
+def set_venues(venues, capacities, types):
+    """ Installs the venue tables and the lookups derived from them. """
+    global venue_dict, venue_capacities, venue_types, venue_names, venue_code, feasibility_index
+    venue_dict = venues
+    venue_capacities = capacities
+    venue_types = types
+    venue_names = list(venue_capacities)
+    venue_code = {venue: i for i, venue in enumerate(venue_names)}
+    feasibility_index = FeasibilityIndex(venue_dict, venue_capacities)
+    decode_gene.cache_clear()
 
 def get_time_range(start_slot, duration):
     start_hour = 8 + start_slot  
     end_hour = start_hour + duration
     return f"{start_hour}:00", f"{end_hour}:00"
 
-# Venue Selection Function with Venue Utilization and Clash Check (End time constraint added)
-def select_venue(session_type, student_count, session_time, session_day):
-    """ Selects an available venue that fits the session type and capacity constraints, checking for time clashes. """
-    available_venues = [v for v in venue_dict[session_type] if venue_capacities.get(v, 0) >= student_count]
-    
-    if not available_venues:
-        return "No Venue"
-    
-    # Sort the venues by usage count (less used venues are prioritized)
-    sorted_venues = sorted(available_venues, key=lambda v: len(venue_schedule[v]))
-
-    for venue in sorted_venues:
-        # Check for time slot clashes in the selected venue
-        clash_found = False
-        for scheduled_session in venue_schedule[venue]:
-            existing_day, existing_start, existing_end = scheduled_session
-            # Ensure the new session does not start before the existing session ends
-            if existing_day == session_day and not (session_time + 2 <= existing_start or session_time >= existing_end):
-                clash_found = True
-                break
-        
-        if not clash_found:
-            # No clash found, so assign the venue
-            venue_schedule[venue].append((session_day, session_time, session_time + 2))
-            return venue  # Venue found with no clash
-    
-    return "No Venue"  # Return if no valid venue found
-
-
-def split_students(subject_id, major, total_students, lecture_hours, tutorial_hours, lab_hours):
-    sessions = []
-    
-    major = str(major)
-    # Get valid lecturers based on the major and ensure they teach max 3 subjects
-    valid_lecturers = [
-        lec for lec in df_lecturers[df_lecturers["Major"].str.contains(major, na=False)]["LecturerID"].tolist()
-        if lecturer_subject_count[lec] < 3
+# ---------------------- Session Expansion ----------------------
+def lecturers_by_major(df_lecturers, majors):
+    """ Inverted index major -> lecturers whose Major names it, in Lecturer sheet order. """
+    return {major: list(dict.fromkeys(df_lecturers.loc[df_lecturers["Major"].str.contains(major, na=False),
+                                                       "LecturerID"]))
+            for major in majors}
+
+def assign_lecturers(majors, df_lecturers):
+    """ Picks two or three lecturers of its major for every subject, in subject order, with no lecturer
+    teaching more than 3 subjects.
+
+    Returns each subject's main lecturer, or None for a subject left with fewer than two
+    lecturers, which gets no sessions.
+    """
+    # The index only ever holds lecturers below the limit: one reaching it is swapped out of
+    # every major's list it is in, so a subject costs O(1) however many lecturers there are
+    index = lecturers_by_major(df_lecturers, set(majors))
+    slot = {major: {lec: k for k, lec in enumerate(lecturers)} for major, lecturers in index.items()}
+
+    subject_count = {}
+    main_lecturers = []
+    for major in majors:
+        valid = index[major]
+        if len(valid) < 2:
+            main_lecturers.append(None)
+            continue
+        subject_lecturers = random.sample(valid, min(3, len(valid)))
+        main_lecturers.append(random.choice(subject_lecturers))
+        for lec in subject_lecturers:
+            subject_count[lec] = subject_count.get(lec, 0) + 1
+            if subject_count[lec] < 3:
+                continue
+            for full_major, slots in slot.items():
+                if lec not in slots:
+                    continue
+                lecturers = index[full_major]
+                last = lecturers.pop()
+                if last != lec:
+                    lecturers[slots[lec]] = last
+                    slots[last] = slots[lec]
+                del slots[lec]
+    return main_lecturers
+
+def group_rows(students, hours, size=40):
+    """ The groups of at most `size` students each tutorial or lab is split into, sizes differing by at most one.
+
+    Returns (subject position, group number, group size) arrays with one entry per group.
+    """
+    groups = np.where(hours > 0, -(-students // size), 0)
+    position = np.repeat(np.arange(len(students)), groups)
+    group = np.arange(len(position)) - np.repeat(np.cumsum(groups) - groups, groups)
+    base, remainder = np.divmod(students, np.maximum(groups, 1))
+    return position, group, base[position] + (group < remainder[position])
+
+# ---------------------- Compact Encoding ----------------------
+class SessionTable:
+    """ Expanded sessions stored column-wise, with subjects and session types integer coded.
+
+    Indexing or iterating yields (subject_id, session_type, student_count, hours, lecturer, venue)
+    tuples; the numeric columns are `array`s that NumPy can view without copying.
+    """
+    __slots__ = ("subject_ids", "subject", "session_type", "student_count", "hours", "lecturer", "venue")
+
+    def __init__(self, sessions=()):
+        sessions = list(sessions)
+        self.subject_ids = list(dict.fromkeys(session[0] for session in sessions))
+        subject_code = {subject_id: i for i, subject_id in enumerate(self.subject_ids)}
+        self.subject = array("i", [subject_code[session[0]] for session in sessions])
+        self.session_type = array("b", [session_types.index(session[1]) for session in sessions])
+        self.student_count = array("i", [session[2] for session in sessions])
+        self.hours = array("b", [session[3] for session in sessions])
+        self.lecturer = [session[4] for session in sessions]
+        self.venue = [session[5] for session in sessions]
+
+    @classmethod
+    def from_columns(cls, subject_ids, subject, session_type, student_count, hours, lecturer, venue):
+        """ A table built straight from its columns, e.g. NumPy arrays, without a tuple per session. """
+        table = cls()
+        table.subject_ids = list(subject_ids)
+        for name, values in (("subject", subject), ("session_type", session_type),
+                             ("student_count", student_count), ("hours", hours)):
+            column = getattr(table, name)
+            column.frombytes(np.ascontiguousarray(values, dtype=column.typecode).tobytes())
+        table.lecturer = list(lecturer)
+        table.venue = list(venue)
+        return table
+
+    def __len__(self):
+        return len(self.subject)
+
+    def __getitem__(self, i):
+        return (self.subject_ids[self.subject[i]], session_types[self.session_type[i]], self.student_count[i],
+                self.hours[i], self.lecturer[i], self.venue[i])
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+# A gene packs (hours, day, time slot, venue) into one integer, so an individual is a flat int array
+day_index = {day: i for i, day in enumerate(days)}
+
+def encode_gene(day, time, venue, hours):
+    return ((hours * len(days) + day_index[day]) * len(times) + time) * len(venue_names) + venue_code[venue]
+
+@lru_cache(maxsize=None)
+def decode_gene(code):
+    """ (day, time slot, venue, lecturer, hours) of a packed gene, with names decoded. """
+    rest, venue = divmod(code, len(venue_names))
+    rest, time = divmod(rest, len(times))
+    hours, day = divmod(rest, len(days))
+    return days[day], time, venue_names[venue], "", hours
+
+def expand_sessions(df_subjects, df_lecturers):
+    """ Splits every subject into its lecture, tutorial and lab sessions.
+
+    Lecturers are assigned subject by subject, as each lecturer's limit depends on the subjects
+    before; the sessions are then computed column-wise over the subject table. A lecture of over
+    300 students becomes two 2-hour halves and a 3-hour lecture a 2-hour and a 1-hour one, both
+    taught by the main lecturer. Sessions come out in subject order: lectures, tutorials, then labs.
+    """
+    main_lecturers = assign_lecturers(df_subjects["Major"].astype(str).tolist(), df_lecturers)
+    subjects = df_subjects[np.array([lecturer is not None for lecturer in main_lecturers], dtype=bool)]
+    main = np.array([lecturer for lecturer in main_lecturers if lecturer is not None], dtype=object)
+    students = subjects["NoStudent"].to_numpy(dtype=np.int64)
+    lecture, tutorial, lab = (pd.to_numeric(subjects[kind], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+                              for kind in session_types)
+    position = np.arange(len(subjects))
+
+    # (subject position, session type, number within the type, students, hours, taught by the main lecturer)
+    split = (lecture > 0) & (students > 300)
+    three = (lecture == 3) & ~split
+    single = (lecture > 0) & ~split & ~three
+    parts = [
+        (position[split], 0, 0, students[split] // 2, 2, True),
+        (position[split], 0, 1, students[split] - students[split] // 2, 2, True),
+        (position[three], 0, 0, students[three], 2, True),
+        (position[three], 0, 1, students[three], 1, True),
+        (position[single], 0, 0, students[single], lecture[single], False),
     ]
+    for session_type, hours in ((1, tutorial), (2, lab)):
+        rows, group, size = group_rows(students, hours)
+        parts.append((rows, session_type, group, size, hours[rows], False))
+
+    columns = [np.concatenate([np.broadcast_to(part[k], len(part[0])) for part in parts]) for k in range(6)]
+    order = np.lexsort((columns[2], columns[1], columns[0]))
+    rows, session_type, _, student_count, hours, taught = (column[order] for column in columns)
+
+    subject, subject_ids = pd.factorize(subjects["SubjectID"].to_numpy()[rows])
+    lecturer = np.where(taught, main[rows], "")
+    return SessionTable.from_columns(subject_ids, subject, session_type, student_count, hours,
+                                     lecturer, [""] * len(rows))
+
+def set_sessions(sessions):
+    """ Installs the expanded sessions the optimiser schedules, with their lookups. """
+    global expanded_subjects, subject_lectures, population_evaluator
+    expanded_subjects = sessions
+
+    # Lecture session indices per subject, in gene order (the first one fixes the venue)
+    subject_lectures = {}
+    for i, (subject_id, session_type, *_) in enumerate(expanded_subjects):
+        if session_type == "Lecture":
+            subject_lectures.setdefault(subject_id, []).append(i)
 
-    if len(valid_lecturers) < 2:
-        return []  
-
-    num_lecturers = min(3, len(valid_lecturers))
-    subject_lecturers = random.sample(valid_lecturers, num_lecturers)  # Select lecturers
-    main_lecturer = random.choice(subject_lecturers)  # Choose the main lecturer for the subject
-
-    # Assign a lecturer to the subject
-    for lec in subject_lecturers:
-        lecturer_subject_count[lec] += 1  
-
-    # Assign Lecture Sessions (Split if 3 hours)
-    if lecture_hours > 0:
-        session_time = random.choice(times)  # Ensure session_time is a valid integer
-
-        lecture_venue = select_venue("Lecture", total_students, session_time, None)  # Assign lecture venue here
-
-        if total_students > 300:
-            first_half = total_students // 2
-            second_half = total_students - first_half
-
-            sessions.append((subject_id, "Lecture", first_half, 2, main_lecturer, lecture_venue))
-            sessions.append((subject_id, "Lecture", second_half, 2, main_lecturer, lecture_venue))
-        else:
-            if lecture_hours == 3:
-                sessions.append((subject_id, "Lecture", total_students, 2, main_lecturer, lecture_venue))
-                sessions.append((subject_id, "Lecture", total_students, 1, main_lecturer, lecture_venue))
-            else:
-                sessions.append((subject_id, "Lecture", total_students, lecture_hours, "", lecture_venue))
-
-    # Create Tutorial/Lab Sessions with different random venues for each session
-    def create_sessions(session_type, total_students, hours):
-        groups = (total_students // 40) + (1 if total_students % 40 != 0 else 0)
-        base_size = total_students // groups
-        remainder = total_students % groups
-        group_sizes = [base_size + (1 if i < remainder else 0) for i in range(groups)]
-
-        for size in group_sizes:
-            session_time = random.choice(times)  # Ensure session_time is a valid integer
-            session_venue = select_venue(session_type, size, session_time, None)  # Different venue for tutorial/lab
-            session_lecturer = random.choice(subject_lecturers)  # Randomly assign a lecturer
-            sessions.append((subject_id, session_type, size, hours, "", session_venue))  # Assign session
-
-    # Tutorial and Lab sessions
-    if tutorial_hours > 0:
-        create_sessions("Tutorial", total_students, tutorial_hours)
-    if lab_hours > 0:
-        create_sessions("Lab", total_students, lab_hours)
-
-    return sessions
-
-expanded_subjects = []
-for _, row in df_subjects.iterrows():
-    expanded_subjects.extend(
-        split_students(row["SubjectID"], row["Major"], int(row["NoStudent"]), 
-                       int(row["Lecture"]) if pd.notna(row["Lecture"]) else 0, 
-                       int(row["Tutorial"]) if pd.notna(row["Tutorial"]) else 0, 
-                       int(row["Lab"]) if pd.notna(row["Lab"]) else 0)
-    )
+    population_evaluator = PopulationEvaluator(expanded_subjects, venue_capacities)
 
 # ---------------------- Genetic Algorithm Setup ----------------------
 creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
-creator.create("Individual", list, fitness=creator.FitnessMin)
+creator.create("Individual", array, typecode="i", fitness=creator.FitnessMin)
 toolbox = base.Toolbox()
 
 def create_individual():
     individual = []
-    venue_schedule = {}  # Track venue usage as {venue: [(day, start_time, end_time)]}
+    occupancy = VenueOccupancy()
+
+    for i, (subject_id, session_type, student_count, hours, lecturer, _) in enumerate(expanded_subjects):
+        fitting_venues = feasibility_index.venues_for(session_type, student_count)
+        if not fitting_venues:
+            raise ValueError(f"No {session_type} venue can seat {student_count} students "
+                             f"(subject {subject_id}, session {i})")
+        if not any(feasibility_index.start_slots(day, hours) for day in days):
+            raise ValueError(f"No start time lets a {hours}-hour {session_type} end at an allowed time "
+                             f"(subject {subject_id}, session {i})")
+
+        def try_slot(day, time):
+            mask = hours_mask(time, hours)
+            venue = occupancy.pick_free(fitting_venues, day, mask)
+            return None if venue is None else (day, time, venue, mask)
+
+        # A random day and valid start slot first; only when every fitting venue is taken
+        # there, go through all days and slots in random order
+        day = random.choice(days)
+        slots = feasibility_index.start_slots(day, hours)
+        placement = try_slot(day, random.choice(slots)) if slots else None
+        for day in random.sample(days, len(days)) if placement is None else []:
+            slots = feasibility_index.start_slots(day, hours)
+            for time in random.sample(slots, len(slots)):
+                placement = try_slot(day, time)
+                if placement:
+                    break
+            if placement:
+                break
 
-    for subject_id, session_type, student_count, hours, lecturer, _ in expanded_subjects:
-        while True:
-            day = random.choice(days)
-            
-            # Define allowed end times based on day
-            if day != "Friday":
-                # For non-Friday days: classes must end at 10,12,14,16,18
-                allowed_end_times = [10, 12, 14, 16, 18]
-            else:
-                # For Friday: classes must end at 10,12,17,19
-                allowed_end_times = [10, 12, 17, 19]
-            
-            # Find possible time slots that would result in these end times
-            possible_slots = []
-            for end_time in allowed_end_times:
-                # Calculate possible start times that would end at this time
-                start_time = end_time - hours
-                if start_time >= 8:  # Earliest class starts at 8am
-                    time_slot = start_time - 8  # Convert to time slot index (0-10)
-                    if 0 <= time_slot <= 10:  # Ensure it's a valid time slot
-                        possible_slots.append(time_slot)
-            
-            if not possible_slots:
-                continue  # Skip if no valid slots for this session length
-            
-            time = random.choice(possible_slots)
-            session_start = 8 + time
-            session_end = session_start + hours
-
-            # Select a venue that fits capacity and doesn't have time clashes
-            available_venues = []
-            for venue in venue_dict[session_type]:
-                if venue_capacities.get(venue, 0) >= student_count:
-                    # Check for time clashes in this venue
-                    clash_found = False
-                    if venue in venue_schedule:
-                        for scheduled_day, scheduled_start, scheduled_end in venue_schedule[venue]:
-                            if day == scheduled_day:
-                                if not (session_end <= scheduled_start or session_start >= scheduled_end):
-                                    clash_found = True
-                                    break
-                    if not clash_found:
-                        available_venues.append(venue)
-
-            if available_venues:
-                venue = random.choice(available_venues)
-                # Track this venue usage
-                if venue not in venue_schedule:
-                    venue_schedule[venue] = []
-                venue_schedule[venue].append((day, session_start, session_end))
-                break  # Valid slot found
-
-        individual.append((day, time, venue, "", hours))
+        if placement is None:
+            raise ValueError(f"Every {session_type} venue seating {student_count} students is booked at every "
+                             f"allowed time (subject {subject_id}, session {i}); add venues or reduce sessions")
+
+        day, time, venue, mask = placement
+        occupancy.book(venue, day, mask)
+        individual.append(encode_gene(day, time, venue, hours))
     return creator.Individual(individual)
     
 toolbox.register("individual", create_individual)
@@ -237,7 +524,7 @@ def evaluate(individual):
     subject_venue_map = {}
 
     for i, entry in enumerate(individual):
-        day, time, venue, lecturer, hours = entry
+        day, time, venue, lecturer, hours = decode_gene(entry)
         subject_id, session_type, student_count, _, _, _ = expanded_subjects[i]
         session_start = 8 + time
         session_end = session_start + hours
@@ -289,250 +576,1824 @@ def evaluate(individual):
 
     return (penalty,)
 
-toolbox.register("mate", tools.cxTwoPoint)
-toolbox.register("mutate", tools.mutShuffleIndexes, indpb=0.2)
-toolbox.register("select", tools.selTournament, tournsize=3)
-toolbox.register("evaluate", evaluate)
+# ---------------------- Vectorized Fitness Engine ----------------------
+# Penalty for one violation of each constraint checked by evaluate()
+penalty_weights = {
+    "end_time": 1000,       # session ends at an hour that is not allowed that day
+    "friday_break": 1000,   # session starts during the Friday 12 PM - 2 PM break
+    "lecture_venue": 50,    # lecture not in the venue of its subject's first lecture
+    "capacity": 50,         # venue too small for the group
+    "slot_clash": 30,       # (day, time) slot already taken by an earlier session
+    "venue_clash": 50,      # venue already booked for an overlapping session
+}
 
-def run_ga():
-    population = toolbox.population(n=100)
-    algorithms.eaSimple(population, toolbox, cxpb=0.5, mutpb=0.2, ngen=50, verbose=True)
-    return tools.selBest(population, k=1)[0]
+# Constraints a usable timetable must not violate at all; repeated (day, time) slots only cost points
+hard_constraints = ("end_time", "friday_break", "lecture_venue", "capacity", "venue_clash")
+
+def hard_feasible(individual):
+    """ True when the schedule violates none of the hard_constraints; slot clashes may remain. """
+    counts = population_evaluator.violations([individual])
+    return not any(counts[kind][0] for kind in hard_constraints)
+
+class PopulationEvaluator:
+    """ Scores a whole population in one batched NumPy call, applying the same penalties as evaluate(). """
+
+    def __init__(self, sessions, capacities):
+        self.capacities = np.array([capacities[v] for v in venue_names], dtype=float)
+        self.student_counts = np.frombuffer(sessions.student_count, dtype=np.intc)
+
+        # Every lecture is compared with the first lecture of the same subject
+        first_lecture = {}
+        self.lecture_idx, self.anchor_idx = [], []
+        for i, (subject_id, session_type, *_) in enumerate(sessions):
+            if session_type == "Lecture":
+                anchor = first_lecture.setdefault(subject_id, i)
+                if anchor != i:
+                    self.lecture_idx.append(i)
+                    self.anchor_idx.append(anchor)
+
+        # end_time_mask[day, end_hour] is True when a session may end at that hour
+        self.end_time_mask = np.zeros((len(days), 33), dtype=bool)
+        for day, end_times in allowed_end_times.items():
+            self.end_time_mask[day_index[day], end_times] = True
+        self.friday = day_index["Friday"]
+
+    def decode(self, population):
+        """ Unpacks the genes into (day index, start slot, venue index, hours) arrays of shape (pop, sessions). """
+        codes = np.frombuffer(b"".join(population), dtype=np.intc).reshape(len(population), -1).astype(np.int64)
+        rest, venue = np.divmod(codes, len(venue_names))
+        rest, slot = np.divmod(rest, len(times))
+        hours, day = np.divmod(rest, len(days))
+        return day, slot, venue, hours
+
+    def __call__(self, population):
+        """ Returns an array with the penalty of every individual in the population. """
+        if not population:
+            return np.zeros(0, dtype=np.int64)
+        counts = self.violations(population)
+        return sum(penalty_weights[kind] * count for kind, count in counts.items())
+
+    def violations(self, population):
+        """ Returns {constraint: array with the number of violations of every individual}. """
+        if not population:
+            return {kind: np.zeros(0, dtype=np.int64) for kind in penalty_weights}
+        day, slot, venue, hours = self.decode(population)
+        pop_size, n_sessions = day.shape
+        if n_sessions == 0:  # Every subject was short of lecturers: nothing to violate
+            return {kind: np.zeros(pop_size, dtype=np.int64) for kind in penalty_weights}
+        start = 8 + slot
+        end = start + hours
+        counts = {}
+
+        # Hard Constraint: allowed end times, and no classes on Friday 12 PM - 2 PM
+        end_allowed = self.end_time_mask[day, np.clip(end, 0, self.end_time_mask.shape[1] - 1)]
+        counts["end_time"] = (~end_allowed).sum(axis=1)
+        counts["friday_break"] = ((day == self.friday) & (start >= 12) & (start < 14)).sum(axis=1)
+
+        # Lectures of a subject must stay in the same venue
+        if self.lecture_idx:
+            counts["lecture_venue"] = (venue[:, self.lecture_idx] != venue[:, self.anchor_idx]).sum(axis=1)
+        else:
+            counts["lecture_venue"] = np.zeros(pop_size, dtype=np.int64)
 
-optimized_schedule = run_ga()
+        # Venue capacity check
+        counts["capacity"] = (self.capacities[venue] < self.student_counts).sum(axis=1)
+
+        # Lecturer clashes: every repeated (day, slot) pair after the first one
+        slot_keys = np.sort(day * (slot.max() + 1) + slot, axis=1)
+        counts["slot_clash"] = (slot_keys[:, 1:] == slot_keys[:, :-1]).sum(axis=1)
+
+        # Venue clashes: a session clashes if any hour it occupies in its venue/day was
+        # already booked by an earlier session. Occupancy is kept as one flat cell id per
+        # (individual, venue, day, hour) booked, so memory stays linear in sessions.
+        n_hours = int(end.max()) + 1
+        gene = np.broadcast_to(np.arange(n_sessions), day.shape)
+        owner = np.arange(pop_size * n_sessions).reshape(day.shape)
+        base = ((np.arange(pop_size)[:, None] * len(self.capacities) + venue) * len(days) + day) * n_hours + start
+        cells, genes, owners = [], [], []
+        for offset in range(int(hours.max())):
+            booked = offset < hours
+            cells.append((base + offset)[booked])
+            genes.append(gene[booked])
+            owners.append(owner[booked])
+        cells, genes, owners = np.concatenate(cells), np.concatenate(genes), np.concatenate(owners)
+
+        order = np.lexsort((genes, cells))
+        cells, genes, owners = cells[order], genes[order], owners[order]
+        first_in_cell = np.r_[True, cells[1:] != cells[:-1]]
+        first_booking = genes[np.maximum.accumulate(np.where(first_in_cell, np.arange(len(cells)), 0))]
+        clashed = np.zeros(pop_size * n_sessions, dtype=bool)
+        clashed[owners[first_booking < genes]] = True
+        counts["venue_clash"] = clashed.reshape(day.shape).sum(axis=1)
+
+        return counts
+
+def evaluate_batch(batch):
+    return population_evaluator(batch).tolist()
+
+def evaluate_population(population, chunksize=None):
+    """ Assigns fitness to every individual of the population with batched evaluations.
+
+    The population is cut into batches of `chunksize` individuals (one batch by default)
+    and scored through toolbox.map, so a registered process pool shares the work.
+    """
+    if not population:
+        return
+    chunksize = chunksize or len(population)
+    batches = [population[i:i + chunksize] for i in range(0, len(population), chunksize)]
+    penalties = chain.from_iterable(toolbox.map(evaluate_batch, batches))
+    for individual, penalty in zip(population, penalties):
+        individual.fitness.values = (int(penalty),)
+
+# ---------------------- Multi-core Evaluation ----------------------
+def init_worker(sessions, capacities, venues, types):
+    """ Pool initializer: receives the session and venue tables once instead of with every task. """
+    set_venues(venues, capacities, types)
+    set_sessions(sessions)
+
+def start_pool(workers):
+    """ Starts a process pool and registers its map in the toolbox. """
+    pool = multiprocessing.Pool(workers, initializer=init_worker,
+                                initargs=(expanded_subjects, venue_capacities, venue_dict, venue_types))
+    toolbox.register("map", pool.map)
+    return pool
+
+def stop_pool(pool):
+    pool.close()
+    pool.join()
+    toolbox.register("map", map)
+
+# ---------------------- Incremental Fitness Evaluation ----------------------
+class ConstraintState:
+    """ Per-individual constraint bookkeeping, so a re-evaluation only touches the changed genes.
+
+    Keeps the venue occupancy as {(venue, day): [gene indices]}, the lecture-venue map
+    {subject: venue of its first lecture} and the lecturer slot map {(day, time): count},
+    together with the penalty each part contributes and running totals of those, so reading
+    the penalty costs the same however large the timetable. The total always equals evaluate().
+    """
+
+    def __init__(self, individual=None):
+        self.genes = [None] * len(expanded_subjects)
+        self.venue_occupancy = {}
+        self.venue_penalty = {}
+        self.lecture_venue = {}
+        self.lecture_penalty = {}
+        self.slot_counts = {}
+        self.entry_penalty = 0  # end time, Friday lunch and capacity rules
+        self.slot_penalty = 0
+        self.venue_total = 0    # sum of venue_penalty
+        self.lecture_total = 0  # sum of lecture_penalty
+        if individual is not None:
+            self.update(individual, range(len(individual)))
+
+    def __deepcopy__(self, memo):
+        # Genes are plain integers, so copying the containers one level deep is enough
+        state = ConstraintState.__new__(ConstraintState)
+        state.genes = self.genes[:]
+        state.venue_occupancy = {key: booked[:] for key, booked in self.venue_occupancy.items()}
+        state.venue_penalty = self.venue_penalty.copy()
+        state.lecture_venue = self.lecture_venue.copy()
+        state.lecture_penalty = self.lecture_penalty.copy()
+        state.slot_counts = self.slot_counts.copy()
+        state.entry_penalty = self.entry_penalty
+        state.slot_penalty = self.slot_penalty
+        state.venue_total = self.venue_total
+        state.lecture_total = self.lecture_total
+        return state
+
+    @property
+    def penalty(self):
+        return self.entry_penalty + self.slot_penalty + self.venue_total + self.lecture_total
+
+    @staticmethod
+    def _entry_penalty(i, entry):
+        day, time, venue, _, hours = decode_gene(entry)
+        student_count = expanded_subjects.student_count[i]
+        session_start = 8 + time
+        penalty = 0 if session_start + hours in allowed_end_times[day] else 1000
+        if day == "Friday" and (12 <= session_start < 14):
+            penalty += 1000
+        if venue_capacities.get(venue, 0) < student_count:
+            penalty += 50
+        return penalty
+
+    def _remove(self, i, entry):
+        day, time, venue, _, _ = decode_gene(entry)
+        self.entry_penalty -= self._entry_penalty(i, entry)
+        self.slot_counts[(day, time)] -= 1
+        if self.slot_counts[(day, time)] > 0:
+            self.slot_penalty -= 30
+        self.venue_occupancy[(venue, day)].remove(i)
+
+    def _add(self, i, entry):
+        day, time, venue, _, _ = decode_gene(entry)
+        self.entry_penalty += self._entry_penalty(i, entry)
+        if self.slot_counts.get((day, time), 0) > 0:
+            self.slot_penalty += 30
+        self.slot_counts[(day, time)] = self.slot_counts.get((day, time), 0) + 1
+        insort(self.venue_occupancy.setdefault((venue, day), []), i)
+
+    def _rescore_venue(self, key):
+        # A booking clashes when it overlaps any earlier booking of the same venue and day
+        booked = [decode_gene(self.genes[i]) for i in self.venue_occupancy.get(key, [])]
+        clashes = 0
+        for n, (_, start, _, _, hours) in enumerate(booked):
+            end = start + hours
+            for _, other_start, _, _, other_hours in booked[:n]:
+                if not (end <= other_start or start >= other_start + other_hours):
+                    clashes += 1
+                    break
+        self.venue_total += 50 * clashes - self.venue_penalty.get(key, 0)
+        self.venue_penalty[key] = 50 * clashes
+
+    def _rescore_lectures(self, subject_id):
+        first, *others = subject_lectures[subject_id]
+        venue = self.lecture_venue[subject_id] = decode_gene(self.genes[first])[2]
+        penalty = 50 * sum(decode_gene(self.genes[i])[2] != venue for i in others)
+        self.lecture_total += penalty - self.lecture_penalty.get(subject_id, 0)
+        self.lecture_penalty[subject_id] = penalty
+
+    def update(self, individual, touched):
+        """ Swaps the contributions of the touched genes for those of their current values. """
+        dirty_venues, dirty_subjects = set(), set()
+        for i in touched:
+            old, new = self.genes[i], individual[i]
+            if old == new:
+                continue
+            if old is not None:
+                self._remove(i, old)
+                old_day, _, old_venue, _, _ = decode_gene(old)
+                dirty_venues.add((old_venue, old_day))
+            self.genes[i] = new
+            self._add(i, new)
+            day, _, venue, _, _ = decode_gene(new)
+            dirty_venues.add((venue, day))
+            if session_types[expanded_subjects.session_type[i]] == "Lecture":
+                dirty_subjects.add(expanded_subjects.subject_ids[expanded_subjects.subject[i]])
+
+        for key in dirty_venues:
+            self._rescore_venue(key)
+        for subject_id in dirty_subjects:
+            self._rescore_lectures(subject_id)
+        return self.penalty
+
+def evaluate_incremental(individual):
+    """ evaluate() for individuals carrying a ConstraintState: only genes listed in `touched` are rescored. """
+    state = getattr(individual, "state", None)
+    if state is None:
+        individual.state = ConstraintState(individual)
+    else:
+        state.update(individual, getattr(individual, "touched", ()))
+    individual.touched = set()
+    return (individual.state.penalty,)
+
+# Variation operators that report the gene indices they touched
+def mark_touched(individual, indices):
+    if not hasattr(individual, "state"):
+        return  # Only incremental scoring reads it; an ever-growing set would slow every clone
+    if not hasattr(individual, "touched"):
+        individual.touched = set()
+    individual.touched.update(indices)
+
+def cx_segment(ind1, ind2):
+    """ Swaps the segment tools.cxTwoPoint would, recording it on both children; returns it as a range. """
+    size = min(len(ind1), len(ind2))
+    cxpoint1 = random.randint(1, size)
+    cxpoint2 = random.randint(1, size - 1)
+    if cxpoint2 >= cxpoint1:
+        cxpoint2 += 1
+    else:  # Swap the two cx points
+        cxpoint1, cxpoint2 = cxpoint2, cxpoint1
+
+    ind1[cxpoint1:cxpoint2], ind2[cxpoint1:cxpoint2] = ind2[cxpoint1:cxpoint2], ind1[cxpoint1:cxpoint2]
+    mark_touched(ind1, range(cxpoint1, cxpoint2))
+    mark_touched(ind2, range(cxpoint1, cxpoint2))
+    return range(cxpoint1, cxpoint2)
+
+def cx_two_point(ind1, ind2):
+    """ tools.cxTwoPoint, recording the swapped segment on both children. """
+    cx_segment(ind1, ind2)
+    return ind1, ind2
+
+def mut_shuffle_indexes(individual, indpb):
+    """ tools.mutShuffleIndexes, recording both positions of every swap. """
+    size = len(individual)
+    touched = []
+    for i in range(size):
+        if random.random() < indpb:
+            swap_indx = random.randint(0, size - 2)
+            if swap_indx >= i:
+                swap_indx += 1
+            individual[i], individual[swap_indx] = individual[swap_indx], individual[i]
+            touched += [i, swap_indx]
+    mark_touched(individual, touched)
+    return individual,
+
+# ---------------------- Constraint-aware Operators ----------------------
+def gene_fits(i, code):
+    """ True when the gene has session i's length, an allowed start slot and a venue of the right type that seats it. """
+    day, time, venue, _, hours = decode_gene(code)
+    return (hours == expanded_subjects.hours[i] and time in feasibility_index.start_slots(day, hours)
+            and venue_types.get(venue) == venue_type_names[session_types[expanded_subjects.session_type[i]]]
+            and venue_capacities.get(venue, 0) >= expanded_subjects.student_count[i])
+
+def lecture_venue_hint(individual, i):
+    """ The venue the lecture rule wants for session i: its subject's first lecture's, or for that
+    first lecture the venue of the next one. None for tutorials and labs.
+    """
+    subject_id, session_type, *_ = expanded_subjects[i]
+    if session_type != "Lecture":
+        return None
+    lectures = subject_lectures[subject_id]
+    other = lectures[0] if lectures[0] != i else (lectures[1] if len(lectures) > 1 else None)
+    return None if other is None else decode_gene(individual[other])[2]
+
+def book_gene(occupancy, slot_counts, code):
+    day, time, venue, _, hours = decode_gene(code)
+    occupancy.book(venue, day, hours_mask(time, hours))
+    slot_counts[(day, time)] = slot_counts.get((day, time), 0) + 1
+
+def schedule_bookings(individual, skip=()):
+    """ VenueOccupancy and {(day, time): sessions starting then} of the individual's genes outside skip.
+
+    Decoded and aggregated column-wise like PopulationEvaluator: this runs for every mutated
+    child and both children of every crossover.
+    """
+    codes = np.frombuffer(individual, dtype=np.intc).astype(np.int64)
+    if len(skip):
+        keep = np.ones(len(codes), dtype=bool)
+        keep[np.fromiter(skip, dtype=np.int64, count=len(skip))] = False
+        codes = codes[keep]
+    rest, venue = np.divmod(codes, len(venue_names))
+    rest, time = np.divmod(rest, len(times))
+    hours, day = np.divmod(rest, len(days))
+
+    # One hour bitmask per (venue, day): OR the masks of the bookings sorted by that key
+    keys = venue * len(days) + day
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    first = np.flatnonzero(np.diff(keys, prepend=-1))
+    bits = np.bitwise_or.reduceat((((1 << hours) - 1) << time)[order], first)
+    occupancy = VenueOccupancy()
+    occupancy.masks = {(venue_names[key // len(days)], days[key % len(days)]): mask
+                       for key, mask in zip(keys[first].tolist(), bits.tolist())}
+
+    slots, counts = np.unique(day * len(times) + time, return_counts=True)
+    slot_counts = {(days[slot // len(times)], slot % len(times)): count
+                   for slot, count in zip(slots.tolist(), counts.tolist())}
+    return occupancy, slot_counts
+
+def feasible_gene(i, occupancy, slot_counts, venue_hint=None, tries=8):
+    """ A gene for session i built only from feasible options: an allowed start slot, a venue that
+    seats the group and is free then (venue_hint first), preferring a (day, time) no other session
+    starts at. None when the random tries find no free venue.
+    """
+    _, session_type, student_count, hours, _, _ = expanded_subjects[i]
+    venues = feasibility_index.venues_for(session_type, student_count)
+    if not venues:
+        return None
+    # Once a session starts at every allowed (day, time) already, the first fitting option is as good as any
+    slots_left = any(not slot_counts.get(start) for start in feasibility_index.start_times(hours))
+    fallback = None
+    for _ in range(tries):
+        day = random.choice(days)
+        slots = feasibility_index.start_slots(day, hours)
+        if not slots:
+            continue
+        time = random.choice(slots)
+        mask = hours_mask(time, hours)
+        if venue_hint in venues and occupancy.is_free(venue_hint, day, mask):
+            venue = venue_hint
+        else:
+            venue = occupancy.pick_free(venues, day, mask)
+        if venue is None:
+            continue
+        if not slots_left or not slot_counts.get((day, time)):
+            return encode_gene(day, time, venue, hours)
+        fallback = fallback or encode_gene(day, time, venue, hours)
+    return fallback
+
+def mut_reassign(individual, indpb):
+    """ Moves each session with probability indpb to a feasible day, start slot and free venue. """
+    chosen = [i for i in range(len(individual)) if random.random() < indpb]
+    if chosen:
+        occupancy, slot_counts = schedule_bookings(individual, skip=set(chosen))
+        for i in chosen:
+            code = feasible_gene(i, occupancy, slot_counts, lecture_venue_hint(individual, i))
+            if code is not None:
+                individual[i] = code
+            book_gene(occupancy, slot_counts, individual[i])
+    mark_touched(individual, chosen)
+    return individual,
+
+def repair_clashes(individual, genes=None):
+    """ Moves every session among `genes` (default: all, in gene order) that overlaps an earlier
+    booking of its venue, or does not fit its own session, to a feasible option. The other genes
+    stay put and are booked first. Returns the moved gene indices.
+    """
+    genes = range(len(individual)) if genes is None else genes
+    occupancy, slot_counts = schedule_bookings(individual, skip=genes)
+    masks = occupancy.masks  # Checked and booked inline: this runs for both children of every crossover
+    repaired = []
+    for i in genes:
+        code = individual[i]
+        day, time, venue, _, hours = decode_gene(code)
+        mask = ((1 << hours) - 1) << time
+        if masks.get((venue, day), 0) & mask or not gene_fits(i, code):
+            new_code = feasible_gene(i, occupancy, slot_counts, lecture_venue_hint(individual, i))
+            if new_code is not None:
+                individual[i] = code = new_code
+                repaired.append(i)
+                day, time, venue, _, hours = decode_gene(code)
+                mask = ((1 << hours) - 1) << time
+        masks[(venue, day)] = masks.get((venue, day), 0) | mask
+        slot_counts[(day, time)] = slot_counts.get((day, time), 0) + 1
+    mark_touched(individual, repaired)
+    return repaired
+
+def cx_two_point_repair(ind1, ind2):
+    """ cx_two_point, then repair_clashes on the swapped segment of both children.
+
+    The genes outside the segment come from one parent and already fit together, so only the
+    segment from the other parent yields where they clash.
+    """
+    segment = cx_segment(ind1, ind2)
+    repair_clashes(ind1, segment)
+    repair_clashes(ind2, segment)
+    return ind1, ind2
+
+toolbox.register("mate", cx_two_point_repair)
+toolbox.register("mutate", mut_reassign, indpb=0.05)
+toolbox.register("select", tools.selTournament, tournsize=3)
+toolbox.register("evaluate", evaluate)
 
-output_data = []
-for i, entry in enumerate(optimized_schedule):
-    day, time_slot, venue, lecturer_id, hours = entry
-    subject_id, session_type, student_count, _, _, _ = expanded_subjects[i]
-    start_time, end_time = get_time_range(time_slot, hours)
-    
-    output_data.append((subject_id, subject_name_dict.get(subject_id, "Unknown"), session_type, day, start_time, end_time, venue, student_count, hours))
+# ---------------------- Checkpoints ----------------------
+checkpoint_version = 1  # Bump when the checkpoint layout changes
+
+def checkpoint_path(excel_path):
+    """ A GA checkpoint lives next to the workbook, e.g. .test.xlsm.checkpoint """
+    folder, name = os.path.split(os.path.abspath(excel_path))
+    return os.path.join(folder, f".{name}.checkpoint")
+
+def problem_hash():
+    """ Hash of the expanded sessions and venues that genes are encoded against. """
+    digest = hashlib.sha256()
+    digest.update(repr((checkpoint_version, expanded_subjects.subject_ids)).encode())
+    for column in (expanded_subjects.subject, expanded_subjects.session_type,
+                   expanded_subjects.student_count, expanded_subjects.hours):
+        digest.update(column.tobytes())
+    # Capacities as floats: a blank Capacity cell is NaN, a venue that fits no group
+    digest.update(repr([(venue, float(venue_capacities[venue]), venue_types[venue]) for venue in venue_names]).encode())
+    return digest.hexdigest()
+
+def save_checkpoint(path, problem, gen, population, hall_of_fame, logbook, improved_at, elapsed):
+    """ Writes the GA state after generation `gen` as a compressed pickle, replacing the file atomically.
+
+    Genes and fitnesses are stored as flat array bytes rather than as pickled individuals.
+    """
+    checkpoint = {
+        "version": checkpoint_version,
+        "problem": problem,
+        "gen": gen,
+        "improved_at": improved_at,
+        "elapsed": elapsed,
+        "genes": array("i", chain.from_iterable(population)).tobytes(),
+        "fitness": array("d", [ind.fitness.values[0] for ind in population]).tobytes(),
+        "hall_of_fame": [(ind.tobytes(), ind.fitness.values[0]) for ind in hall_of_fame],
+        "logbook": list(logbook),
+        "random": random.getstate(),
+    }
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)))
+    os.replace(temp_path, path)
+
+def load_checkpoint(path):
+    """ Reads a checkpoint written by save_checkpoint(); raises ValueError for another layout. """
+    with open(path, "rb") as f:
+        checkpoint = pickle.loads(zlib.decompress(f.read()))
+    if checkpoint.get("version") != checkpoint_version:
+        raise ValueError(f"{path} was written by another version of the scheduler")
+    return checkpoint
+
+def restore_individual(genes, penalty):
+    individual = creator.Individual(genes)
+    individual.fitness.values = (penalty,)
+    return individual
+
+def restore_population(checkpoint):
+    """ The checkpoint's population and hall of fame as scored individuals. """
+    genes = array("i")
+    genes.frombytes(checkpoint["genes"])
+    fitness = array("d")
+    fitness.frombytes(checkpoint["fitness"])
+    length = len(genes) // len(fitness)
+    population = [restore_individual(genes[k * length:(k + 1) * length], penalty)
+                  for k, penalty in enumerate(fitness)]
+    hall_of_fame = tools.HallOfFame(1)
+    for data, penalty in checkpoint["hall_of_fame"]:
+        best = array("i")
+        best.frombytes(data)
+        hall_of_fame.insert(restore_individual(best, penalty))
+    return population, hall_of_fame
+
+# ---------------------- Run Trace ----------------------
+class RunTrace:
+    """ Wall-clock time of every stage of a run, plus the per-generation GA logbook. """
+
+    def __init__(self, **info):
+        self.info = info     # Run-wide facts written first, e.g. the input path
+        self.phases = []     # (phase, seconds) in the order the phases finished
+        self.logbook = tools.Logbook()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def records(self):
+        """ The trace as JSON-ready dicts: the run, then its phases, then one per generation. """
+        yield {"type": "run", **self.info}
+        for name, seconds in self.phases:
+            yield {"type": "phase", "phase": name, "seconds": round(seconds, 6)}
+        for entry in self.logbook:
+            yield {"type": "generation", **entry}
+
+    def write(self, path):
+        """ Writes the trace as JSON lines. """
+        with open(path, "w") as f:
+            for record in self.records():
+                f.write(json.dumps(record) + "\n")
+
+def trace_path(output_file):
+    """ The trace sits next to its output, e.g. optimized_schedule_1.trace.jsonl """
+    return f"{os.path.splitext(output_file)[0]}.trace.jsonl"
+
+def run_ga(n=100, ngen=50, cxpb=0.5, mutpb=0.2, incremental=False, workers=1, chunksize=None, progress=None,
+           trace=None, patience=None, time_limit=None, verbose=True, checkpoint=None, checkpoint_every=None,
+           checkpoint_seconds=None, resume=None, stop_when_feasible=True):
+    """ Same generational loop as algorithms.eaSimple, but each generation is scored in one batched call.
+
+    The loop stops early once the best schedule meets every hard constraint (with
+    stop_when_feasible=False: once it has zero penalty), after `patience` generations without a
+    better schedule, or when `time_limit` seconds have passed since the run started.
+    The best schedule seen in any generation is kept in a hall of fame and returned.
+
+    With incremental=True every individual keeps a ConstraintState and offspring are
+    rescored from the genes the operators touched, instead of from scratch.
+    With workers > 1 the batches are scored on a process pool of that size, `chunksize`
+    individuals per task. Incremental scoring always runs in this process.
+    progress, when given, is called as progress(gen, population) once every generation is scored;
+    it may change the population in place, and returning True stops the run.
+    Each generation's logbook entry holds the min/avg penalty, the violations of each kind in the
+    best individual and the seconds spent selecting, varying and evaluating. With a RunTrace the
+    entries go to its logbook and population init is timed as a phase.
+    With a `checkpoint` path the state is saved there every `checkpoint_every` generations and/or
+    `checkpoint_seconds` seconds. A checkpoint loaded into `resume` continues that run as if it had
+    never stopped: its population, hall of fame, logbook, patience count, elapsed time and RNG state.
+    """
+    started = time.perf_counter()
+    trace = RunTrace() if trace is None else trace
+    logbook = trace.logbook
+    logbook.header = ["gen", "nevals", "min", "avg", "best"]
+    if resume is None:
+        with trace.phase("init"):
+            population = toolbox.population(n=n)
+        hall_of_fame = tools.HallOfFame(1)
+    else:
+        population, hall_of_fame = restore_population(resume)
+        for entry in resume["logbook"]:
+            logbook.record(**entry)
+        started -= resume["elapsed"]
+        random.setstate(resume["random"])
+        if incremental:
+            for ind in population:
+                ind.state = ConstraintState(ind)
+    n = len(population)
+
+    pool = start_pool(workers) if workers > 1 and not incremental else None
+    if pool is not None and chunksize is None:
+        chunksize = -(-n // workers)
+
+    stats = tools.Statistics(lambda ind: ind.fitness.values[0])
+    stats.register("min", min)
+    stats.register("avg", lambda penalties: round(float(np.mean(penalties)), 2))
+
+    def evaluate_invalid(individuals):
+        if incremental:
+            for ind in individuals:
+                ind.fitness.values = evaluate_incremental(ind)
+        else:
+            evaluate_population(individuals, chunksize)
+
+    def record(gen, nevals, **seconds):
+        hall_of_fame.update(population)
+        best = min(population, key=lambda ind: ind.fitness.values[0])
+        violations = {kind: int(count[0]) for kind, count in population_evaluator.violations([best]).items()}
+        logbook.record(gen=gen, nevals=nevals, **stats.compile(population),
+                       best=hall_of_fame[0].fitness.values[0], **violations,
+                       **{name: round(value, 6) for name, value in seconds.items()})
+        if verbose:
+            print(logbook.stream)
+        return progress is not None and progress(gen, population)
+
+    # Generation at which the best-so-far penalty last went down
+    improved_at = 0 if resume is None else resume["improved_at"]
+    if not (checkpoint_every or checkpoint_seconds):
+        checkpoint = None
+    problem = problem_hash() if checkpoint else None
+    saved_at = time.perf_counter()
+
+    def save_if_due(gen):
+        nonlocal saved_at
+        now = time.perf_counter()
+        if not ((checkpoint_every and gen % checkpoint_every == 0)
+                or (checkpoint_seconds and now - saved_at >= checkpoint_seconds)):
+            return
+        save_checkpoint(checkpoint, problem, gen, population, hall_of_fame, logbook, improved_at, now - started)
+        saved_at = now
+
+    def stop_reason(gen, stop_requested):
+        if hall_of_fame[0].fitness.values[0] == 0:
+            return "zero penalty"
+        if stop_when_feasible and hard_feasible(hall_of_fame[0]):
+            return "hard constraints met"
+        if patience is not None and gen - improved_at >= patience:
+            return f"no improvement in {patience} generations"
+        if time_limit is not None and time.perf_counter() - started >= time_limit:
+            return f"time limit of {time_limit:g} s"
+        if stop_requested:
+            return "stop requested"
+        return None
+
+    try:
+        if resume is None:
+            first_gen = 1
+            clock = time.perf_counter()
+            evaluate_invalid(population)
+            stop_requested = record(0, len(population), select_s=0.0, vary_s=0.0,
+                                    evaluate_s=time.perf_counter() - clock)
+            reason = stop_reason(0, stop_requested)
+        else:
+            first_gen = resume["gen"] + 1
+            reason = None
+        for gen in range(first_gen, ngen + 1):
+            if reason is not None:
+                break
+            best_penalty = hall_of_fame[0].fitness.values[0]
+            clock = time.perf_counter()
+            offspring = toolbox.select(population, len(population))
+            selected = time.perf_counter()
+            offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+            varied = time.perf_counter()
+            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            evaluate_invalid(invalid_ind)
+            population[:] = offspring
+            stop_requested = record(gen, len(invalid_ind), select_s=selected - clock, vary_s=varied - selected,
+                                    evaluate_s=time.perf_counter() - varied)
+            if hall_of_fame[0].fitness.values[0] < best_penalty:
+                improved_at = gen
+            reason = stop_reason(gen, stop_requested)
+            if checkpoint and reason is None:
+                save_if_due(gen)
+    finally:
+        if pool is not None:
+            stop_pool(pool)
+
+    trace.info["stop"] = reason or f"{ngen} generations"
+    if verbose:
+        print(f"Stopped after generation {logbook[-1]['gen']}: {trace.info['stop']}")
+    return hall_of_fame[0]
+
+# ---------------------- Island Model ----------------------
+island_topologies = ("ring", "all")
+
+def migration_targets(index, islands, topology):
+    """ Islands that island `index` sends its emigrants to: the next one on a ring, or all the others. """
+    if topology == "ring":
+        return [(index + 1) % islands] if islands > 1 else []
+    return [i for i in range(islands) if i != index]
+
+def run_island(index, seed, problem, inboxes, topology, stop, results, interval, migrants, ga_options):
+    """ Island process: runs its own GA and trades its best schedules with the other islands.
+
+    Every `interval` generations the island sends copies of its `migrants` best schedules to
+    its targets. Whatever has arrived in its inbox replaces its worst schedules. Migration is
+    asynchronous, so a slow island never holds up the others.
+    """
+    init_worker(*problem)
+    random.seed(seed)
+    inbox = inboxes[index]
+    targets = [inboxes[i] for i in migration_targets(index, len(inboxes), topology)]
+
+    def migrate(gen, population):
+        if gen > 0 and gen % interval == 0:
+            emigrants = tools.selBest(population, migrants)
+            for target in targets:
+                target.put(emigrants)
+
+        immigrants = []
+        while True:
+            try:
+                immigrants.extend(inbox.get_nowait())
+            except queue.Empty:
+                break
+        if immigrants:
+            worst = sorted(range(len(population)), key=lambda i: population[i].fitness.values[0], reverse=True)
+            for i, immigrant in zip(worst, immigrants):
+                population[i] = immigrant
+
+        # A schedule meeting every hard constraint (or of zero penalty) on any island ends the whole run
+        best = min(population, key=lambda ind: ind.fitness.values[0])
+        if best.fitness.values[0] == 0 or (ga_options.get("stop_when_feasible", True) and hard_feasible(best)):
+            stop.set()
+        return stop.is_set()
+
+    trace = RunTrace()
+    best = run_ga(progress=migrate, trace=trace, verbose=False, **ga_options)
+    for target in targets:
+        target.cancel_join_thread()  # Emigrants nobody picks up any more must not block the exit
+    results.put((index, best, list(trace.logbook), trace.phases, trace.info["stop"]))
+
+def run_islands(islands=4, n=100, ngen=50, interval=5, migrants=2, topology="ring", seed=None, trace=None,
+                **ga_options):
+    """ Island-model GA: `islands` processes each evolve a population of n with their own seed.
+
+    The best schedules migrate every `interval` generations along the topology ("ring" or "all").
+    The first schedule meeting every hard constraint (with stop_when_feasible=False: of zero penalty)
+    stops every island. Returns the best schedule over all islands.
+    Other keyword arguments (patience, time_limit, cxpb, ...) go to every island's run_ga().
+    """
+    if topology not in island_topologies:
+        raise ValueError(f"Unknown island topology {topology!r}, expected one of {island_topologies}")
+    trace = RunTrace() if trace is None else trace
+    seed = random.randrange(2**31) if seed is None else seed
+
+    problem = (expanded_subjects, venue_capacities, venue_dict, venue_types)
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    ga_options = dict(ga_options, n=n, ngen=ngen)
+    processes = [
+        multiprocessing.Process(target=run_island, daemon=True,
+                                args=(i, seed + i, problem, inboxes, topology, stop, results,
+                                      interval, migrants, ga_options))
+        for i in range(islands)
+    ]
+    for process in processes:
+        process.start()
+
+    outcomes = []
+    try:
+        while len(outcomes) < islands:
+            try:
+                outcomes.append(results.get(timeout=1))
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("An island process failed; see its traceback above")
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    outcomes.sort(key=lambda outcome: outcome[0])
+    stops = {}
+    for index, best, entries, phases, reason in outcomes:
+        for name, seconds in phases:
+            trace.phases.append((f"{name} (island {index})", seconds))
+        for entry in entries:
+            trace.logbook.record(island=index, **entry)
+        stops[index] = reason
+        print(f"Island {index}: best penalty {best.fitness.values[0]:g} after generation {entries[-1]['gen']} ({reason})")
+    trace.info.update(islands=islands, topology=topology, seed=seed, stop=stops)
+    return min((outcome[1] for outcome in outcomes), key=lambda ind: ind.fitness.values[0])
+
+# ---------------------- Local Search ----------------------
+def venue_free_in(state, venue, day, time, hours, skip):
+    """ True when no gene of the ConstraintState other than `skip` overlaps the slot in the venue. """
+    for k in state.venue_occupancy.get((venue, day), ()):
+        if k != skip:
+            _, other_time, _, _, other_hours = decode_gene(state.genes[k])
+            if time < other_time + other_hours and other_time < time + hours:
+                return False
+    return True
+
+def random_move_gene(i, individual, state, probes=4):
+    """ A new gene for session i: random day and allowed start slot, and a fitting venue that is
+    free then if one of a few probes finds it (its subject's lecture venue first for lectures).
+    """
+    _, session_type, student_count, hours, _, _ = expanded_subjects[i]
+    day = random.choice(days)
+    slots = feasibility_index.start_slots(day, hours)
+    venues = feasibility_index.venues_for(session_type, student_count)
+    if not slots or not venues:
+        return individual[i]
+    time = random.choice(slots)
+    hint = lecture_venue_hint(individual, i)
+    candidates = ([hint] if hint in venues else []) + [random.choice(venues) for _ in range(probes)]
+    venue = next((v for v in candidates if venue_free_in(state, v, day, time, hours, i)), candidates[-1])
+    return encode_gene(day, time, venue, hours)
+
+def run_local_search(max_moves=100000, time_limit=None, patience=None, start_temperature=50.0,
+                     end_temperature=1.0, swap_rate=0.3, log_every=2000, trace=None, progress=None,
+                     verbose=True, start=None, movable=None, stop_when_feasible=True):
+    """ Simulated annealing from a single create_individual() schedule, or from `start`.
+
+    A move either gives one session a new day, start slot and fitting venue, or swaps the start
+    times of two sessions of the same length. The ConstraintState rescores only the genes a move
+    touches, with the same rules as evaluate(). A worse schedule is accepted with probability
+    exp(-delta / T), T cooling geometrically from start_temperature to end_temperature over the
+    move budget (or the time limit, when that runs out sooner).
+
+    Stops once the best schedule meets every hard constraint (with stop_when_feasible=False: at
+    zero penalty), after `patience` moves without a better schedule, or when the budget runs out, and returns the best schedule seen. Every `log_every` moves a logbook entry is made
+    and progress(moves, best), when given, is called; returning True stops the run.
+    With `movable`, only those gene indices are moved and every other session stays where it is.
+    """
+    started = time.perf_counter()
+    trace = RunTrace() if trace is None else trace
+    if start is None:
+        with trace.phase("init"):
+            current = toolbox.individual()
+    else:
+        current = creator.Individual(start)
+    state = ConstraintState(current)
+    penalty = state.penalty
+    best, best_penalty, improved_at = array("i", current), penalty, 0
+    best_hard = penalty - state.slot_penalty  # Slot clashes are the only soft cost
+
+    movable = list(range(len(current))) if movable is None else list(movable)
+    if not movable:
+        max_moves = 0  # Everything is pinned: just score the start
+
+    # Movable sessions of each length, the partners a swap can exchange start times with
+    same_length = {}
+    for i in movable:
+        same_length.setdefault(expanded_subjects.hours[i], []).append(i)
+
+    logbook = trace.logbook
+    logbook.header = ["moves", "penalty", "best", "temperature", "accepted"]
+    cooling = math.log(end_temperature / start_temperature)
+    accepted = 0
+    reason = None
+    move, temperature = 0, start_temperature
+
+    def record(moves, temperature):
+        violations = {kind: int(count[0]) for kind, count in population_evaluator.violations([best]).items()}
+        logbook.record(moves=moves, penalty=penalty, best=best_penalty, temperature=round(temperature, 3),
+                       accepted=accepted, **violations, seconds=round(time.perf_counter() - started, 6))
+        if verbose:
+            print(logbook.stream)
+        return progress is not None and progress(moves, best)
+
+    for move in range(1, max_moves + 1):
+        budget_used = move / max_moves
+        if time_limit is not None:
+            budget_used = max(budget_used, (time.perf_counter() - started) / time_limit)
+        temperature = start_temperature * math.exp(cooling * min(budget_used, 1.0))
+
+        i = random.choice(movable)
+        if random.random() < swap_rate:
+            j = random.choice(same_length[expanded_subjects.hours[i]])
+            day_i, time_i, venue_i, _, hours_i = decode_gene(current[i])
+            day_j, time_j, venue_j, _, hours_j = decode_gene(current[j])
+            changes = {i: encode_gene(day_j, time_j, venue_i, hours_i), j: encode_gene(day_i, time_i, venue_j, hours_j)}
+        else:
+            changes = {i: random_move_gene(i, current, state)}
+        undo = {k: current[k] for k in changes}
+        for k, code in changes.items():
+            current[k] = code
+
+        new_penalty = state.update(current, changes)
+        delta = new_penalty - penalty
+        if delta <= 0 or random.random() < math.exp(-delta / temperature):
+            penalty = new_penalty
+            accepted += 1
+            if penalty < best_penalty:
+                best, best_penalty, improved_at = array("i", current), penalty, move
+                best_hard = penalty - state.slot_penalty
+        else:
+            for k, code in undo.items():
+                current[k] = code
+            state.update(current, undo)
+
+        if best_penalty == 0:
+            reason = "zero penalty"
+        elif stop_when_feasible and best_hard == 0:
+            reason = "hard constraints met"
+        elif patience is not None and move - improved_at >= patience:
+            reason = f"no improvement in {patience} moves"
+        elif budget_used >= 1.0 and time_limit is not None and move < max_moves:
+            reason = f"time limit of {time_limit:g} s"
+        stop_requested = (move % log_every == 0 or reason is not None) and record(move, temperature)
+        if reason is None and stop_requested:
+            reason = "stop requested"
+        if reason is not None:
+            break
+
+    if (move % log_every != 0 or move == 0) and reason is None:
+        record(move, temperature)
+    trace.info["stop"] = reason or f"{max_moves} moves"
+    if verbose:
+        print(f"Stopped after {move} moves: {trace.info['stop']}")
+
+    result = creator.Individual(best)
+    result.fitness.values = (best_penalty,)
+    return result
+
+# ---------------------- Decomposition ----------------------
+def venue_pools():
+    """ Gene indices of the Lecture, Tutorial and Lab sessions.
+
+    Each session type only uses venues of its own type, so venue clashes, capacity and the
+    lecture venue rule never involve two pools; only sessions starting at the same (day, time)
+    (slot_clash) can.
+    """
+    pools = {}
+    for i, session_type in enumerate(expanded_subjects.session_type):
+        pools.setdefault(session_types[session_type], []).append(i)
+    return pools
+
+def solve_pool(name, seed, problem, engine, options):
+    """ Pool task: optimises one venue pool's sessions as a timetable of their own. """
+    init_worker(*problem)
+    random.seed(seed)
+    trace = RunTrace()
+    if engine == "local-search":
+        best = run_local_search(trace=trace, verbose=False, **options)
+    else:
+        best = run_ga(trace=trace, verbose=False, **options)
+    return name, array("i", best), best.fitness.values[0], list(trace.logbook), trace.phases, trace.info.get("stop")
+
+def run_decomposed(engine="ga", seed=None, joint_moves=20000, joint_patience=2000, trace=None, **options):
+    """ Optimises the venue pools as separate sub-timetables on parallel processes, then merges them.
+
+    Every pool is solved with the given engine ("ga" or "local-search"; other keyword arguments
+    go to its run_ga() or run_local_search()) and seed + k. The merged schedule gets a short joint
+    local-search pass over all sessions, at a low temperature, to settle the slot clashes between
+    pools. Returns the best schedule of that pass.
+    """
+    trace = RunTrace() if trace is None else trace
+    seed = random.randrange(2**31) if seed is None else seed
+    pools = venue_pools()
+    tasks = [(name, seed + k, (SessionTable(expanded_subjects[i] for i in indices), venue_capacities, venue_dict,
+                               venue_types), engine, options)
+             for k, (name, indices) in enumerate(pools.items())]
+    with multiprocessing.Pool(len(tasks)) as pool:
+        outcomes = pool.starmap(solve_pool, tasks)
+
+    genes = array("i", [0]) * len(expanded_subjects)
+    summary = {}
+    for name, best, penalty, entries, phases, reason in outcomes:
+        for i, code in zip(pools[name], best):
+            genes[i] = code
+        for phase, seconds in phases:
+            trace.phases.append((f"{phase} ({name})", seconds))
+        for entry in entries:
+            trace.logbook.record(pool=name, **entry)
+        summary[name] = {"sessions": len(pools[name]), "penalty": penalty, "stop": reason}
+        print(f"{name}: {len(pools[name])} sessions, best penalty {penalty:g} ({reason})")
+
+    merged = creator.Individual(genes)
+    summary["merged"] = float(population_evaluator([merged])[0])
+    print(f"Merged: penalty {summary['merged']:g}")
+    with trace.phase("joint pass"):
+        best = run_local_search(max_moves=joint_moves, patience=joint_patience, start_temperature=5.0,
+                                start=merged, trace=trace, verbose=False,
+                                stop_when_feasible=options.get("stop_when_feasible", True))
+    summary["joint"] = best.fitness.values[0]
+    print(f"Joint pass: penalty {summary['joint']:g}")
+    trace.info.update(decomposition=summary, seed=seed)
+    return best
+
+# ---------------------- Warm Start ----------------------
+def read_timetable(path):
+    """ The Timetable rows of a previous output workbook as a DataFrame. """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        header, *rows = wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+    return pd.DataFrame(rows, columns=header).dropna(how="all")
+
+def warm_start(previous_df):
+    """ Seeds a schedule from a previous timetable and says which sessions may move.
+
+    The timetable records every session's subject, type, group size and length, which is all the
+    Subject sheet contributes to a session, so diffing the current sessions against its rows
+    finds what the input edits changed. A session matching a row (in order, per subject) keeps
+    that row's day, start and venue, unless the venue no longer exists or fits, or it overlaps a
+    session kept before it. Everything else is placed from feasible options around the kept ones.
+
+    Returns (individual, movable gene indices, {"kept": n, "changed": n, "clashing": n}).
+    """
+    previous = {}
+    for row in previous_df.itertuples(index=False):
+        key = (str(row.SubjectID), row.SessionType, int(row.StudentCount), int(row.Hours))
+        start_hour = int(str(row.StartTime).split(":")[0])
+        previous.setdefault(key, []).append((row.Day, start_hour - 8, row.Venue))
+
+    occupancy, slot_counts = VenueOccupancy(), {}
+    genes, movable = [None] * len(expanded_subjects), []
+    counts = {"kept": 0, "changed": 0, "clashing": 0}
+    for i, (subject_id, session_type, student_count, hours, _, _) in enumerate(expanded_subjects):
+        placements = previous.get((str(subject_id), session_type, student_count, hours))
+        if not placements:
+            counts["changed"] += 1
+            movable.append(i)
+            continue
+        day, time, venue = placements.pop(0)
+        code = encode_gene(day, time, venue, hours) if venue in venue_code and day in day_index else None
+        if code is None or not gene_fits(i, code):
+            counts["changed"] += 1
+            movable.append(i)
+        elif not occupancy.is_free(venue, day, hours_mask(time, hours)):
+            counts["clashing"] += 1
+            movable.append(i)
+        else:
+            counts["kept"] += 1
+            genes[i] = code
+            book_gene(occupancy, slot_counts, code)
+
+    for i in movable:
+        # Lectures go to the venue already kept for their subject when it is free
+        subject_id = expanded_subjects[i][0]
+        kept_lectures = [genes[k] for k in subject_lectures.get(subject_id, []) if genes[k] is not None]
+        hint = decode_gene(kept_lectures[0])[2] if kept_lectures else None
+        code = feasible_gene(i, occupancy, slot_counts, hint, tries=32)
+        if code is None:  # Every probe was booked: take a clashing place, the search moves it
+            code = feasible_gene(i, VenueOccupancy(), {}, hint)
+        if code is None:
+            raise ValueError(f"No venue or start time fits session {i} of subject {subject_id}")
+        genes[i] = code
+        book_gene(occupancy, slot_counts, code)
+
+    return creator.Individual(genes), movable, counts
+
+# ---------------------- Output ----------------------
+def build_output_df(schedule, df_subjects):
+    """ Decodes the optimized schedule into the Timetable rows written to the workbook. """
+    # SubjectID -> SubjectName mapping
+    subject_name_dict = df_subjects.set_index("SubjectID")["SubjectName"].to_dict()
+
+    output_data = []
+    for i, entry in enumerate(schedule):
+        day, time_slot, venue, lecturer_id, hours = decode_gene(entry)
+        subject_id, session_type, student_count, _, _, _ = expanded_subjects[i]
+        start_time, end_time = get_time_range(time_slot, hours)
 
-# Add an empty "Lecturer Name" column at the end of the DataFrame
-output_df = pd.DataFrame(output_data, columns=["SubjectID", "SubjectName", "SessionType", "Day", "StartTime", "EndTime", "Venue", "StudentCount", "Hours"])
+        output_data.append((subject_id, subject_name_dict.get(subject_id, "Unknown"), session_type, day, start_time, end_time, venue, student_count, hours))
 
-# Add an empty column for "Lecturer Name"
-output_df["LecturerName"] = ""
+    output_df = pd.DataFrame(output_data, columns=["SubjectID", "SubjectName", "SessionType", "Day", "StartTime", "EndTime", "Venue", "StudentCount", "Hours"])
 
+    # Add an empty column for "Lecturer Name"
+    output_df["LecturerName"] = ""
+    return output_df
 
 # ---------------------- Auto-Increment File Saving ----------------------
 def get_next_filename(base_name="optimized_schedule", ext=".xlsx"):
+    """ The first free numbered name, claimed by creating it empty so a concurrent run skips it. """
     count = 1
-    while os.path.exists(f"{base_name}_{count}{ext}"):
-        count += 1
-    return f"{base_name}_{count}{ext}"
-
-# Save the output DataFrame to a new file with auto-incremented name
-output_file = get_next_filename()
-output_df.to_excel(output_file, index=False)
-
-# Apply borders and autofit to the new sheet
-wb = load_workbook(output_file)
-ws = wb.active  # Select the first sheet
-
-# --- Add Excel Table Format ---
-from openpyxl.worksheet.table import Table, TableStyleInfo
-
-# Define table range (from A1 to the last cell with data)
-min_col = 1
-max_col = ws.max_column
-min_row = 1
-max_row = ws.max_row
-
-table_range = f"{ws.cell(row=min_row, column=min_col).coordinate}:{ws.cell(row=max_row, column=max_col).coordinate}"
-table = Table(displayName="Timetable", ref=table_range)
-
-# Apply a table style
-style = TableStyleInfo(
-    name="TableStyleMedium9",
-    showFirstColumn=False,
-    showLastColumn=False,
-    showRowStripes=True,
-    showColumnStripes=False
-)
-table.tableStyleInfo = style
-ws.add_table(table)
-
-# Define border style
-border = Border(
-    left=Side(border_style="thin", color="000000"),
-    right=Side(border_style="thin", color="000000"),
-    top=Side(border_style="thin", color="000000"),
-    bottom=Side(border_style="thin", color="000000"),
-)
-
-# Apply border to all cells in the worksheet
-for row in ws.iter_rows():
-    for cell in row:
-        cell.border = border
-
-# Autofit columns
-for col in ws.columns:
-    max_length = 0
-    column = col[0].column_letter  # Get the column name
-    for cell in col:
+    while True:
+        name = f"{base_name}_{count}{ext}"
         try:
-            if len(str(cell.value)) > max_length:
-                max_length = len(cell.value)
-        except:
-            pass
-    adjusted_width = (max_length + 2)  # Adjust the width a bit more
-    ws.column_dimensions[column].width = adjusted_width
+            os.close(os.open(name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))  # Not executable
+            return name
+        except FileExistsError:
+            count += 1
+
+def get_latest_filename(input_path, base_name="optimized_schedule", ext=".xlsx"):
+    """ The most recently written output scheduled from input_path, or None when there is none yet.
+
+    Outputs are matched by the input recorded in their trace, so a folder of batch-scheduled
+    workbooks never hands one workbook another's timetable. Outputs without a trace are skipped.
+    """
+    input_path = os.path.normcase(os.path.abspath(input_path))
+    folder, prefix = os.path.split(base_name)
+    candidates = []
+    for name in os.listdir(folder or "."):
+        stem, found_ext = os.path.splitext(name)
+        number = stem[len(prefix) + 1:]
+        if found_ext != ext or not stem.startswith(f"{prefix}_") or not number.isdigit():
+            continue
+        path = os.path.join(folder, name)
+        try:
+            with open(trace_path(path)) as f:
+                run = json.loads(f.readline())
+            modified = os.path.getmtime(path)
+        except (OSError, ValueError):
+            continue  # No readable trace, e.g. an output still being written
+        if os.path.normcase(run.get("input", "")) == input_path:
+            candidates.append((modified, int(number), path))
+    return max(candidates)[2] if candidates else None
+
+def write_workbook(output_df, output_file, charts=None, native=False, trace=None):
+    """ Writes the Timetable sheet, and the Dashboard sheet when charts are given, in one write-only pass.
+
+    Rows are streamed straight to the file, so save time and memory grow linearly with the sessions.
+    With native=True the dashboard is built from native Excel charts instead of rendered images.
+    A RunTrace adds a Run Summary sheet with the phase timings and the GA logbook.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+
+    # Column widths from the longest text in each column (header included), a bit wider
+    for i, column in enumerate(output_df.columns, start=1):
+        lengths = output_df[column].astype(str).str.len()
+        max_length = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        ws.column_dimensions[get_column_letter(i)].width = max_length + 2
+
+    # --- Add Excel Table Format ---
+    table_range = f"A1:{get_column_letter(len(output_df.columns))}{len(output_df) + 1}"
+    table = Table(displayName="Timetable", ref=table_range)
+
+    # A write-only sheet cannot read the headings back, so the table columns are declared here
+    table.tableColumns = [TableColumn(id=i, name=str(column)) for i, column in enumerate(output_df.columns, start=1)]
+    table.autoFilter = AutoFilter(ref=table_range)
+
+    # Apply a table style
+    style = TableStyleInfo(
+        name="TableStyleMedium9",
+        showFirstColumn=False,
+        showLastColumn=False,
+        showRowStripes=True,
+        showColumnStripes=False
+    )
+    table.tableStyleInfo = style
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "In write-only mode you must add table columns manually")
+        ws.add_table(table)
+
+    # Define border style
+    border = Border(
+        left=Side(border_style="thin", color="000000"),
+        right=Side(border_style="thin", color="000000"),
+        top=Side(border_style="thin", color="000000"),
+        bottom=Side(border_style="thin", color="000000"),
+    )
 
-# Save the modified file
-wb.save(output_file)
+    # Every cell of the table gets a border
+    def bordered(value):
+        cell = WriteOnlyCell(ws, value)
+        cell.border = border
+        return cell
+
+    ws.append([bordered(column) for column in output_df.columns])
+    for row in output_df.itertuples(index=False):
+        ws.append([bordered(value) for value in row])
+
+    if trace is not None:
+        add_run_summary(wb, trace)
+    if native:
+        charts = native_charts(wb, output_df)
+    if charts:
+        add_dashboard(wb, charts)
+
+    wb.save(output_file)
+
+def add_run_summary(wb, trace):
+    """ Appends the Run Summary sheet: seconds per phase, then one row per logbook entry. """
+    ws = wb.create_sheet("Run Summary")
+    ws.column_dimensions["A"].width = 14
+    bold = Font(bold=True)
+
+    def heading(values):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value)
+            cell.font = bold
+            cells.append(cell)
+        return cells
+
+    ws.append(heading(["Phase", "Seconds"]))
+    for name, seconds in trace.phases:
+        ws.append([name, round(seconds, 3)])
+
+    if trace.logbook:
+        ws.append([])
+        # A decomposed run logs GA generations and then local-search steps: keep every column
+        columns = list(dict.fromkeys(chain.from_iterable(trace.logbook)))
+        ws.append(heading(columns))
+        for entry in trace.logbook:
+            ws.append([entry.get(column) for column in columns])
 
 # ---------------------- Visualization and Dashboard ----------------------
-import matplotlib.pyplot as plt
-from openpyxl.drawing.image import Image
-from openpyxl.utils import get_column_letter
+def session_hours(output_df):
+    """ Starting hour of every session in output_df. """
+    try:
+        return pd.to_datetime(output_df['StartTime'], format='%H:%M').dt.hour
+    except ValueError:
+        return pd.to_datetime(output_df['StartTime']).dt.hour
+
+def plot_venue_usage(data, ax):
+    data.plot(kind='bar', ax=ax)
+    ax.set_ylabel('Number of Sessions')
+
+def plot_session_distribution(data, ax):
+    data.plot(kind='pie', autopct='%1.1f%%', ax=ax)
+    ax.set_ylabel('')
+
+def plot_daily_sessions(data, ax):
+    data.plot(kind='bar', stacked=True, ax=ax)
+    ax.set_ylabel('Number of Sessions')
+
+def plot_hourly_sessions(data, ax):
+    data.plot(kind='bar', stacked=True, ax=ax)
+    ax.set_ylabel('Number of Sessions')
+    ax.set_xlabel('Starting Hour')
+
+def plot_venue_heatmap(data, ax):
+    import seaborn as sns
+    sns.heatmap(data, annot=True, fmt="d", cmap="YlGnBu", ax=ax)
+
+def plot_subject_sessions(data, ax):
+    data.plot(kind='barh', ax=ax, color='skyblue')
+    ax.set_xlabel('Number of Sessions')
+
+# Dashboard charts in rendering order:
+# (header, cell holding the header, chart title, matplotlib plot, figure size, native Excel chart kind)
+# The chart sits one row below its header.
+dashboard_layout = [
+    ("Venue Utilization", "A2", "Top 10 Most Used Venues", plot_venue_usage, (8, 5), "col"),
+    ("Session Distribution", "C2", "Session Type Distribution", plot_session_distribution, (6, 5), "pie"),
+    ("Daily Schedule Pattern", "A19", "Sessions per Day by Type", plot_daily_sessions, (8, 5), "stacked"),
+    ("Hourly Schedule Pattern", "C19", "Sessions per Hour by Type", plot_hourly_sessions, (8, 5), "stacked"),
+    ("Venue Usage Heatmap", "A36", "Heatmap of Venue Usage by Hour and Day", plot_venue_heatmap, (8, 6), "heatmap"),
+    ("Subject-wise Session Count", "C36", "Sessions per Subject", plot_subject_sessions, (10, 6), "bar"),
+]
+
+def dashboard_tables(output_df):
+    """ The aggregated data behind each dashboard chart, in dashboard_layout order. """
+    hourly_df = output_df.assign(Hour=session_hours(output_df))
+    return [
+        # 1. Venue Usage by Type (Top 10)
+        output_df.groupby(['SessionType', 'Venue']).size().unstack(fill_value=0)
+                 .sum().sort_values(ascending=False).head(10).rename('Sessions'),
+        # 2. Session Type Distribution
+        output_df['SessionType'].value_counts().rename('Sessions'),
+        # 3. Daily Session Distribution
+        output_df.groupby(['Day', 'SessionType']).size().unstack(fill_value=0),
+        # 4. Hourly Session Distribution
+        hourly_df.groupby(['Hour', 'SessionType']).size().unstack(fill_value=0),
+        # 5. Hourly venue usage matrix
+        hourly_df.pivot_table(index='Hour', columns='Day', values='Venue', aggfunc='count', fill_value=0),
+        # 6. Subject-wise Session Count
+        output_df['SubjectName'].value_counts().sort_values(ascending=True).rename('Sessions'),
+    ]
 
-# Create a directory for temporary image files
-os.makedirs('temp_plots', exist_ok=True)
-
-# Function to save plots as images
-def save_plot(fig, filename, dpi=100):
-    path = os.path.join('temp_plots', filename)
-    fig.savefig(path, bbox_inches='tight', dpi=dpi)
-    plt.close(fig)
-    return path
-
-# 1. Venue Usage by Type (Top 10)
-venue_counts = output_df.groupby(['SessionType', 'Venue']).size().unstack(fill_value=0)
-fig1, ax1 = plt.subplots(figsize=(8, 5))
-venue_counts.sum().sort_values(ascending=False).head(10).plot(
-    kind='bar', ax=ax1, title='Top 10 Most Used Venues'
-)
-ax1.set_ylabel('Number of Sessions')
-venue_usage_path = save_plot(fig1, 'venue_usage.png', dpi=120)
-
-# 2. Session Type Distribution
-fig2, ax2 = plt.subplots(figsize=(6, 5))
-output_df['SessionType'].value_counts().plot(
-    kind='pie', autopct='%1.1f%%', ax=ax2, title='Session Type Distribution'
-)
-session_dist_path = save_plot(fig2, 'session_distribution.png', dpi=120)
-
-# 3. Daily Session Distribution
-fig3, ax3 = plt.subplots(figsize=(8, 5))
-output_df.groupby(['Day', 'SessionType']).size().unstack().plot(
-    kind='bar', stacked=True, ax=ax3, title='Sessions per Day by Type'
-)
-ax3.set_ylabel('Number of Sessions')
-daily_sessions_path = save_plot(fig3, 'daily_sessions.png', dpi=120)
-
-# 4. Hourly Session Distribution
-try:
-    output_df['Hour'] = pd.to_datetime(output_df['StartTime'], format='%H:%M').dt.hour
-except ValueError:
-    output_df['Hour'] = pd.to_datetime(output_df['StartTime']).dt.hour
-
-fig4, ax4 = plt.subplots(figsize=(8, 5))
-output_df.groupby(['Hour', 'SessionType']).size().unstack().plot(
-    kind='bar', stacked=True, ax=ax4, title='Sessions per Hour by Type'
-)
-ax4.set_ylabel('Number of Sessions')
-ax4.set_xlabel('Starting Hour')
-hourly_sessions_path = save_plot(fig4, 'hourly_sessions.png', dpi=120)
-
-#5. Prepare hourly venue usage matrix
-heatmap_df = output_df.copy()
-heatmap_df['Hour'] = pd.to_datetime(heatmap_df['StartTime'], format='%H:%M').dt.hour
-heatmap_matrix = heatmap_df.pivot_table(index='Hour', columns='Day', values='Venue', aggfunc='count', fill_value=0)
-
-# Create heatmap
-import seaborn as sns
-fig5, ax5 = plt.subplots(figsize=(8, 6))
-sns.heatmap(heatmap_matrix, annot=True, fmt="d", cmap="YlGnBu", ax=ax5)
-ax5.set_title("Heatmap of Venue Usage by Hour and Day")
-heatmap_path = save_plot(fig5, 'venue_heatmap.png', dpi=120)
-
-# 5. Subject-wise Session Count
-fig6, ax6 = plt.subplots(figsize=(10, 6))
-output_df['SubjectName'].value_counts().sort_values(ascending=True).plot(
-    kind='barh', ax=ax6, color='skyblue', title='Sessions per Subject'
-)
-ax6.set_xlabel('Number of Sessions')
-subject_session_path = save_plot(fig6, 'subject_sessions.png', dpi=120)
-
-
-# Create dashboard sheet with table layout
-wb = load_workbook(output_file)
-if 'Dashboard' in wb.sheetnames:
-    wb.remove(wb['Dashboard'])
-wb.create_sheet('Dashboard')
-dashboard = wb['Dashboard']
-
-# Set column widths
-for col in ['A', 'C']:
-    dashboard.column_dimensions[col].width = 55
-
-# Add title
-dashboard.merge_cells('A1:C1')
-dashboard['A1'] = 'SCHEDULING DASHBOARD'
-dashboard['A1'].font = 'Arial Black'
-dashboard['A1'].font = '18'
-dashboard['A1'].alignment = Alignment(horizontal='center')
-
-# Add images in a 2x2 grid layout
-img1 = Image(venue_usage_path)
-img1.width, img1.height = 395, 300
-dashboard.add_image(img1, 'A3')
-
-img2 = Image(session_dist_path)
-img2.width, img2.height = 395, 300
-dashboard.add_image(img2, 'C3')
-
-img3 = Image(daily_sessions_path)
-img3.width, img3.height = 395, 300
-dashboard.add_image(img3, 'A20')
-
-img4 = Image(hourly_sessions_path)
-img4.width, img4.height = 395, 300
-dashboard.add_image(img4, 'C20')
-
-img5 = Image(heatmap_path)
-img5.width, img5.height = 395, 300
-dashboard.add_image(img5, 'A37')
-
-img6 = Image(subject_session_path)
-img6.width, img6.height = 395, 300
-dashboard.add_image(img6, 'C37')
-
-# Add chart titles as headers
-dashboard['A2'] = 'Venue Utilization'
-dashboard['C2'] = 'Session Distribution'
-dashboard['A19'] = 'Daily Schedule Pattern'
-dashboard['C19'] = 'Hourly Schedule Pattern'
-dashboard['A36'] = 'Venue Usage Heatmap'
-dashboard['C36'] = 'Subject-wise Session Count'
-
-# Format headers
-for cell in ['A2', 'C2', 'A19', 'C19']:
-    dashboard[cell].font = 'Calibri'
-    dashboard[cell].font = '14'
-    dashboard[cell].font = 'Bold'
-    dashboard[cell].alignment = Alignment(horizontal='center')
-
-# Add borders to create table effect
-thin_border = Border(left=Side(style='thin'), 
-                     right=Side(style='thin'), 
-                     top=Side(style='thin'), 
-                     bottom=Side(style='thin'))
-
-for row in range(2, 35):
+def render_chart_png(title, plot, figsize, data):
+    """ Draws one dashboard chart and returns it as PNG bytes. """
+    # Plotting libraries are only imported when a dashboard is actually rendered
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        plot(data, ax)
+        ax.set_title(title)
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight', dpi=120)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+def render_charts(output_df, workers=1):
+    """ Renders the dashboard charts as PNG bytes, in dashboard_layout order.
+
+    With more than one worker the charts are drawn in parallel processes. Only the aggregated
+    tables and the PNG bytes cross the process boundary, and nothing is written to disk.
+    Serial is the default: a process started with spawn (Windows, scheduler.exe) imports pandas
+    and matplotlib again, which costs more than the six charts take to draw.
+    """
+    jobs = [(title, plot, figsize, data)
+            for (_, _, title, plot, figsize, _), data in zip(dashboard_layout, dashboard_tables(output_df))]
+    workers = min(len(jobs), workers or 1)
+    if workers <= 1:
+        return [render_chart_png(*job) for job in jobs]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(render_chart_png, jobs)
+
+def native_charts(wb, output_df):
+    """ Writes the aggregated dashboard tables to a ChartData sheet and returns native Excel charts over them.
+
+    Excel has no heatmap chart: the hour/day matrix is shown as a clustered column chart on the
+    dashboard and gets a colour scale on the ChartData sheet instead.
+    """
+    data_ws = wb.create_sheet('ChartData')
+    charts = []
+    first_row = 1
+    for (_, _, title, _, _, kind), data in zip(dashboard_layout, dashboard_tables(output_df)):
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        data_ws.append([frame.index.name] + [str(column) for column in frame.columns])
+        for label, values in zip(frame.index.tolist(), frame.to_numpy().tolist()):
+            data_ws.append([label] + values)
+        last_row = first_row + len(frame)
+        last_col = len(frame.columns) + 1
+
+        if kind == "pie":
+            chart = PieChart()
+            chart.dataLabels = DataLabelList()
+            chart.dataLabels.showPercent = True
+        else:
+            chart = BarChart()
+            chart.type = "bar" if kind == "bar" else "col"
+            chart.y_axis.title = 'Number of Sessions'
+            if kind == "stacked":
+                chart.grouping = "stacked"
+                chart.overlap = 100
+            if kind == "heatmap":
+                cells = f"B{first_row + 1}:{get_column_letter(last_col)}{last_row}"
+                data_ws.conditional_formatting.add(cells, ColorScaleRule(
+                    start_type='min', start_color='FFFFD9', mid_type='percentile', mid_value=50,
+                    mid_color='41B6C4', end_type='max', end_color='225EA8'))
+        chart.title = title
+        chart.add_data(Reference(data_ws, min_col=2, min_row=first_row, max_col=last_col, max_row=last_row),
+                       titles_from_data=True)
+        chart.set_categories(Reference(data_ws, min_col=1, min_row=first_row + 1, max_row=last_row))
+        if len(frame.columns) == 1:
+            chart.legend = None
+        charts.append(chart)
+        first_row = last_row + 2
+        data_ws.append([])
+    return charts
+
+def add_dashboard(wb, charts):
+    """ Appends the Dashboard sheet to a write-only workbook: a title, then the charts in a 2-column grid.
+
+    charts holds either PNG bytes from render_charts() or native Excel charts from native_charts().
+    """
+    dashboard = wb.create_sheet('Dashboard', 1)  # right after the timetable, before any ChartData
+
+    # Set column widths
     for col in ['A', 'C']:
-        cell = f"{col}{row}"
-        dashboard[cell].border = thin_border
-
-# Save the workbook with dashboard
-wb.save(output_file)
-
-# Open the optimized schedule file (Windows)
-os.startfile(output_file)
-
-# Clean up temporary plot files
-for file in os.listdir('temp_plots'):
-    os.remove(os.path.join('temp_plots', file))
-os.rmdir('temp_plots')
+        dashboard.column_dimensions[col].width = 55
+
+    # Add title
+    dashboard.merged_cells.add('A1:C1')
+    title = WriteOnlyCell(dashboard, 'SCHEDULING DASHBOARD')
+    title.font = Font(name='Arial Black', size=18)
+    title.alignment = Alignment(horizontal='center')
+    dashboard.append([title])
+
+    # Chart headers, and borders down columns A and C to create table effect
+    headers = {anchor: header for header, anchor, *_ in dashboard_layout}
+    header_font = Font(name='Calibri', size=14, bold=True)
+    thin_border = Border(left=Side(style='thin'), 
+                         right=Side(style='thin'), 
+                         top=Side(style='thin'), 
+                         bottom=Side(style='thin'))
+
+    last_row = max(int(anchor[1:]) for anchor in headers)
+    for row in range(2, last_row + 1):
+        cells = []
+        for col in ['A', 'B', 'C']:
+            header = headers.get(f"{col}{row}")
+            bordered = col != 'B' and row <= 34
+            if header is None and not bordered:
+                cells.append(None)
+                continue
+            cell = WriteOnlyCell(dashboard, header)
+            if header is not None:
+                cell.font = header_font
+                cell.alignment = Alignment(horizontal='center')
+            if bordered:
+                cell.border = thin_border
+            cells.append(cell)
+        dashboard.append(cells)
+
+    # Add the charts under their headers, at the size of the rendered images (395x300 px)
+    for (header, anchor, *_), chart in zip(dashboard_layout, charts):
+        cell = f"{anchor[0]}{int(anchor[1:]) + 1}"
+        if isinstance(chart, bytes):
+            img = Image(BytesIO(chart))
+            img.width, img.height = 395, 300
+            dashboard.add_image(img, cell)
+        else:
+            chart.width, chart.height = 10.45, 7.94  # centimetres
+            dashboard.add_chart(chart, cell)
+
+# ---------------------- Batch Scheduling ----------------------
+def batch_inputs(source):
+    """ Input workbooks of a batch: the .xlsx/.xlsm files in a directory, or the paths listed in a
+    manifest file, one per line and relative to it (blank lines and # comments are skipped).
+    """
+    if os.path.isdir(source):
+        return [os.path.join(source, name) for name in sorted(os.listdir(source))
+                if name.lower().endswith((".xlsx", ".xlsm")) and not name.startswith(("~$", "optimized_schedule"))]
+    folder = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(folder, line) for line in lines if line and not line.startswith("#")]
+
+def schedule_workbook(args):
+    """ Batch task: schedules one workbook and reports its output, penalty and runtime, or its error. """
+    started = time.perf_counter()
+    result = {"Workbook": args.input}
+    try:
+        with redirect_stdout(StringIO()):  # The logbook is in the trace; jobs would interleave on the console
+            trace = schedule(args, open_output=False)
+        result.update(Output=trace.info["output"], Sessions=trace.info["sessions"],
+                      Penalty=trace.info["penalty"], Stop=trace.info.get("stop"))
+    except Exception as error:
+        result["Error"] = f"{type(error).__name__}: {error}"
+    result["Seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def run_batch(args):
+    """ Schedules every workbook of args.batch at once on a pool of args.batch_workers processes.
+
+    Every workbook gets a fresh process (maxtasksperchild=1), so jobs never share the module-level
+    problem tables. Outputs are claimed by get_next_filename, so jobs writing to the same folder
+    cannot pick the same name. Returns the batch_summary_N.csv written next to the batch.
+    """
+    inputs = batch_inputs(args.batch)
+    if not inputs:
+        raise ValueError(f"No input workbooks in {args.batch}")
+    jobs = []
+    for path in inputs:
+        job = argparse.Namespace(**vars(args))
+        job.input, job.chart_workers = path, 1  # Pool processes cannot start pools of their own
+        jobs.append(job)
+
+    workers = min(len(jobs), args.batch_workers or os.cpu_count() or 1)
+    started = time.perf_counter()
+    results = []
+    with multiprocessing.Pool(workers, maxtasksperchild=1) as pool:
+        for result in pool.imap_unordered(schedule_workbook, jobs):
+            results.append(result)
+            outcome = result.get("Error") or f"penalty {result['Penalty']:g} -> {result['Output']}"
+            print(f"[{len(results)}/{len(jobs)}] {result['Workbook']} ({result['Seconds']:.1f} s): {outcome}")
+    elapsed = time.perf_counter() - started
+
+    summary = pd.DataFrame(results, columns=["Workbook", "Output", "Sessions", "Penalty", "Seconds", "Stop", "Error"])
+    summary = summary.set_index("Workbook").loc[inputs].reset_index()
+    summary["Sessions"] = summary["Sessions"].astype("Int64")  # Stays whole next to failed rows
+    folder = args.batch if os.path.isdir(args.batch) else os.path.dirname(os.path.abspath(args.batch))
+    summary_file = get_next_filename(os.path.join(folder, "batch_summary"), ".csv")
+    summary.to_csv(summary_file, index=False)
+    print(f"{len(jobs)} workbooks in {elapsed:.1f} s on {workers} processes "
+          f"({len(jobs) * 60 / elapsed:.1f} per minute); summary: {summary_file}")
+    return summary_file
+
+# ---------------------- Daemon ----------------------
+class ProgressStream:
+    """ Stands in for stdout while a daemon job runs: every complete line goes to the job's client. """
+
+    def __init__(self, loop, messages):
+        self.loop = loop
+        self.messages = messages
+        self.pending = ""
+
+    def write(self, text):
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self.loop.call_soon_threadsafe(self.messages.put_nowait, {"progress": line})
+        return len(text)
+
+    def flush(self):
+        pass
+
+def warm_up():
+    """ Imports the plotting libraries the first dashboard would otherwise import, so no job waits for them. """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+    import seaborn
+
+def run_job(request, stream):
+    """ Daemon job: parses a client's command line and schedules its workbook. Returns the message
+    that ends the client's wait: {"output", "penalty", "seconds"} or {"error"}.
+    """
+    parser = build_parser()
+    usage = StringIO()
+    try:
+        with redirect_stderr(usage):
+            args = parser.parse_args(request["argv"])
+    except SystemExit:
+        lines = usage.getvalue().strip().splitlines()
+        return {"error": lines[-1] if lines else "invalid options"}
+    if args.serve or args.batch:
+        return {"error": "the daemon schedules one workbook per job: drop --serve and --batch"}
+    conflict = option_conflicts(args)
+    if conflict:
+        return {"error": conflict}
+
+    # Paths are the client's: relative ones resolve against its working directory
+    args.input = os.path.join(request["cwd"], args.input)
+    if args.warm_start not in (None, "latest"):
+        args.warm_start = os.path.join(request["cwd"], args.warm_start)
+
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(stream):
+            trace = schedule(args, open_output=False)
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    return {"output": trace.info["output"], "penalty": trace.info["penalty"],
+            "seconds": round(time.perf_counter() - started, 3)}
+
+def request_problem(request):
+    """ Why a decoded client request cannot be queued, or None. """
+    if not isinstance(request, dict):
+        return "expected a JSON object on one line"
+    argv = request.get("argv")
+    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+        return '"argv" must be a list of strings'
+    if not isinstance(request.get("cwd"), str):
+        return '"cwd" must be a string'
+    return None
+
+async def serve(port=daemon_port):
+    """ --serve: schedules workbooks for --submit clients on localhost, with every module already imported
+    and recent inputs kept parsed in memory.
+
+    A client sends one JSON line {"argv": [...], "cwd": ...}. Jobs wait in an asyncio queue and run
+    one at a time, so concurrent clicks queue up instead of competing for the CPU. The client
+    gets {"queued": jobs ahead of it}, then {"progress": line} for every line the run prints,
+    then run_job()'s result.
+    """
+    warm_up()
+    loop = asyncio.get_running_loop()
+    jobs = asyncio.Queue()
+    running = 0
+
+    async def worker():
+        nonlocal running
+        while True:
+            request, messages = await jobs.get()
+            running = 1
+            try:
+                result = await loop.run_in_executor(None, run_job, request, ProgressStream(loop, messages))
+            except Exception as error:  # The worker must outlive any job, or every later one waits forever
+                print(f"Job {request['argv']} failed: {error!r}", file=sys.stderr)
+                result = {"error": f"{type(error).__name__}: {error}"}
+            running = 0
+            messages.put_nowait(result)
+
+    async def handle(reader, writer):
+        try:
+            try:
+                request = json.loads(await reader.readline())
+            except ValueError:
+                request = None
+            messages = asyncio.Queue()
+            problem = request_problem(request)
+            if problem:
+                messages.put_nowait({"error": f"bad request: {problem}"})
+            else:
+                messages.put_nowait({"queued": jobs.qsize() + running})
+                jobs.put_nowait((request, messages))
+            while True:
+                message = await messages.get()
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+                if "progress" not in message and "queued" not in message:
+                    break
+        except ConnectionError:
+            pass  # A client that goes away still gets its output written
+        finally:
+            writer.close()
+
+    worker_task = asyncio.create_task(worker())  # Held so the task is not garbage collected
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    print(f"Scheduler daemon listening on 127.0.0.1:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+# ---------------------- Entry Point ----------------------
+def refuse(message):
+    raise ValueError(message)
+
+def build_parser():
+    # The Excel macro starts the scheduler next to its workbook
+    script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+
+    parser = argparse.ArgumentParser(description="Generate an optimized timetable from test.xlsm")
+    parser.add_argument("--input", default=os.path.join(script_dir, "test.xlsm"),
+                        help="input workbook (default: test.xlsm next to the scheduler)")
+    parser.add_argument("--population", type=int, default=100,
+                        help="number of schedules in the GA population (default: 100)")
+    parser.add_argument("--generations", type=int, default=50,
+                        help="maximum number of GA generations (default: 50)")
+    parser.add_argument("--patience", type=int, default=20,
+                        help="stop after this many generations without a better schedule (default: 20, 0 = never)")
+    parser.add_argument("--keep-optimizing", action="store_true",
+                        help="do not stop once every hard constraint is met: keep reducing slot clashes until "
+                             "--patience, --time-limit or the generation/move budget ends the run")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="stop the GA after this many seconds (default: no limit)")
+    parser.add_argument("--engine", choices=("ga", "local-search"), default=None,
+                        help="optimiser: the genetic algorithm or simulated-annealing local search (default: ga)")
+    parser.add_argument("--moves", type=int, default=200000,
+                        help="maximum number of local-search moves (default: 200000)")
+    parser.add_argument("--warm-start", nargs="?", const="latest", metavar="PREVIOUS",
+                        help="re-optimise only the sessions changed since a previous optimized_schedule_N.xlsx "
+                             "(default: the latest one scheduled from the same input)")
+    parser.add_argument("--checkpoint-every", type=int, default=0,
+                        help="save a GA checkpoint next to the input every this many generations (default: 0 = off)")
+    parser.add_argument("--checkpoint-seconds", type=float, default=60,
+                        help="save a GA checkpoint at least this often, in seconds (default: 60, 0 = off)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the GA run saved in the input's checkpoint")
+    parser.add_argument("--decompose", action="store_true",
+                        help="optimise the Lecture, Tutorial and Lab sessions on parallel processes, "
+                             "then settle clashes between them in a short joint pass")
+    parser.add_argument("--islands", type=int, default=1,
+                        help="run an island-model GA on this many processes (default: 1, a single population)")
+    parser.add_argument("--migration-interval", type=int, default=5,
+                        help="generations between migrations between islands (default: 5)")
+    parser.add_argument("--migrants", type=int, default=2,
+                        help="best schedules each island sends per migration (default: 2)")
+    parser.add_argument("--topology", choices=island_topologies, default="ring",
+                        help="islands send migrants to the next island (ring) or to all others (default: ring)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for a reproducible run; island i uses seed + i")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes used to evaluate the population (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="individuals sent to a worker per task (default: population split evenly)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="GA: rescore offspring from the genes the operators changed instead of in one batch")
+    parser.add_argument("--headless", action="store_true",
+                        help="skip the dashboard and do not open the output file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the input workbook instead of reusing the cached tables")
+    parser.add_argument("--native-charts", action="store_true",
+                        help="build the dashboard from native Excel charts instead of rendered images")
+    parser.add_argument("--chart-workers", type=int, default=1,
+                        help="number of processes rendering the dashboard images (default: 1)")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="schedule every workbook in this directory, or listed in this manifest file, "
+                             "with the options above, and write a batch_summary_N.csv")
+    parser.add_argument("--batch-workers", type=int, default=None,
+                        help="workbooks scheduled at the same time in --batch mode (default: one per CPU)")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a localhost daemon that keeps everything loaded and schedules --submit jobs")
+    parser.add_argument("--submit", action="store_true",
+                        help="hand the job to a running --serve daemon and wait for it (without one, run here)")
+    parser.add_argument("--port", type=int, default=daemon_port,
+                        help=f"daemon port for --serve and --submit (default: {daemon_port})")
+    return parser
+
+def option_conflicts(args):
+    """ Why the options cannot be used together, or None. """
+    if args.incremental and (args.engine == "local-search" or args.workers > 1 or args.warm_start):
+        return "--incremental rescores GA offspring in this process: drop --workers, --warm-start and local search"
+    if args.resume and (args.engine == "local-search" or args.islands > 1 or args.warm_start or args.decompose):
+        return "--resume continues a single-population GA run only"
+    if args.warm_start and args.islands > 1:
+        return "--warm-start re-optimises the changed sessions with local search: drop --islands"
+    if args.decompose and (args.islands > 1 or args.workers > 1 or args.warm_start):
+        return "--decompose already runs one process per venue pool: drop --islands, --workers and --warm-start"
+    if args.batch and (args.islands > 1 or args.workers > 1 or args.decompose):
+        return "--batch runs every workbook in one process: drop --islands, --workers and --decompose"
+    return None
+
+def main(argv=None):
+    """ Command-line entry point: schedules the input workbook, or every workbook of a --batch. """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    conflict = option_conflicts(args)
+    if conflict:
+        parser.error(conflict)
+    if args.serve:
+        try:
+            asyncio.run(serve(args.port))
+        except KeyboardInterrupt:
+            pass
+        return None
+    if args.batch:
+        try:
+            return run_batch(args)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    return schedule(args, parser.error).info["output"]
+
+def schedule(args, error=refuse, open_output=True):
+    """ Load inputs, expand sessions, optimize, write the workbook and render the dashboard.
+
+    Returns the run's trace. Problems with the options, such as a stale checkpoint, go to error(message).
+    """
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    trace = RunTrace(input=os.path.abspath(args.input), started=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    with trace.phase("load"):
+        df_subjects, df_venues, df_lecturers = load_inputs(args.input, use_cache=not args.no_cache)
+    with trace.phase("expand"):
+        set_venues(*venue_tables(df_venues))
+        set_sessions(expand_sessions(df_subjects, df_lecturers))
+    trace.info["sessions"] = len(expanded_subjects)
+    if not len(expanded_subjects):
+        error("no sessions to schedule: the Subject sheet is empty or every subject has fewer than "
+              "two lecturers of its major")
+
+    # Checkpoints are kept for single-population GA runs and removed once the output is written
+    single_ga = args.engine != "local-search" and args.islands <= 1 and not args.warm_start and not args.decompose
+    checkpoint = checkpoint_path(args.input) if single_ga else None
+    saves_checkpoints = bool(args.checkpoint_every or args.checkpoint_seconds)
+    resume = None
+    if args.resume:
+        if not os.path.exists(checkpoint):
+            error(f"no checkpoint to resume: {checkpoint}")
+        try:
+            resume = load_checkpoint(checkpoint)
+        except ValueError as problem:
+            error(str(problem))
+        if resume["problem"] != problem_hash():
+            error(f"the inputs changed since {checkpoint} was saved; run without --resume to start over")
+        trace.info["resumed_from"] = resume["gen"]
+        print(f"Resuming from generation {resume['gen']}")
+
+    # Every engine stops once the hard constraints are met, unless asked to keep reducing slot clashes
+    stop_when_feasible = not args.keep_optimizing
+
+    # Outputs go next to the input workbook with auto-incremented names
+    output_dir = os.path.dirname(os.path.abspath(args.input))
+    previous = args.warm_start
+    if previous == "latest":
+        previous = get_latest_filename(args.input, os.path.join(output_dir, "optimized_schedule"))
+        if previous is None:
+            print(f"No previous optimized schedule of {args.input} to warm-start from; optimising from scratch")
+
+    if previous:
+        if args.engine == "ga":  # Only an explicit --engine ga; the default is None
+            print("--warm-start re-optimises the changed sessions with local search; --engine ga is ignored")
+        with trace.phase("warm start"):
+            start, movable, counts = warm_start(read_timetable(previous))
+        trace.info["warm_start"] = {"previous": previous, **counts}
+        print(f"Warm start from {previous}: {counts['kept']} sessions kept, "
+              f"{counts['changed']} changed, {counts['clashing']} clashing")
+        with trace.phase("local search"):
+            # Patience scales with what is left to place: a handful of moved sessions settle quickly
+            optimized_schedule = run_local_search(max_moves=args.moves, time_limit=args.time_limit,
+                                                  patience=max(2000, 50 * len(movable)), trace=trace,
+                                                  start=start, movable=movable, stop_when_feasible=stop_when_feasible)
+    else:
+        with trace.phase("local search" if args.engine == "local-search" else "ga"):
+            if args.decompose:
+                if args.engine == "local-search":
+                    options = dict(max_moves=args.moves, time_limit=args.time_limit,
+                                   stop_when_feasible=stop_when_feasible)
+                else:
+                    options = dict(n=args.population, ngen=args.generations, patience=args.patience or None,
+                                   time_limit=args.time_limit, incremental=args.incremental,
+                                   stop_when_feasible=stop_when_feasible)
+                optimized_schedule = run_decomposed(args.engine or "ga", args.seed, trace=trace, **options)
+            elif args.engine == "local-search":
+                optimized_schedule = run_local_search(max_moves=args.moves, time_limit=args.time_limit, trace=trace,
+                                                      stop_when_feasible=stop_when_feasible)
+            elif args.islands > 1:
+                optimized_schedule = run_islands(args.islands, args.population, args.generations,
+                                                 args.migration_interval, args.migrants, args.topology, args.seed,
+                                                 trace=trace, patience=args.patience or None,
+                                                 time_limit=args.time_limit, incremental=args.incremental,
+                                                 stop_when_feasible=stop_when_feasible)
+            else:
+                optimized_schedule = run_ga(n=args.population, ngen=args.generations, workers=args.workers,
+                                            incremental=args.incremental,
+                                            chunksize=args.chunksize, trace=trace, patience=args.patience or None,
+                                            time_limit=args.time_limit,
+                                            checkpoint=checkpoint if saves_checkpoints else None,
+                                            checkpoint_every=args.checkpoint_every,
+                                            checkpoint_seconds=args.checkpoint_seconds, resume=resume,
+                                            stop_when_feasible=stop_when_feasible)
+    trace.info["penalty"] = float(population_evaluator([optimized_schedule])[0])
+    output_df = build_output_df(optimized_schedule, df_subjects)
+
+    charts = None
+    if not args.headless and not args.native_charts:
+        with trace.phase("dashboard"):
+            charts = render_charts(output_df, args.chart_workers)
+    output_file = get_next_filename(os.path.join(output_dir, "optimized_schedule"))
+    trace.info["output"] = output_file
+    try:
+        with trace.phase("write"):
+            write_workbook(output_df, output_file, charts, native=args.native_charts and not args.headless,
+                           trace=trace)
+    except BaseException:
+        os.remove(output_file)  # Give the claimed name back
+        raise
+
+    # The trace goes next to the output; it also covers the workbook write
+    trace.write(trace_path(output_file))
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)  # The run finished: nothing left to resume
+
+    # Open the optimized schedule file (Windows)
+    if open_output and not args.headless and hasattr(os, "startfile"):
+        os.startfile(output_file)
+
+    return trace
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Pool workers of the frozen scheduler.exe start here
+    main()
@@ -0,0 +1,20 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The scheduler is a script, not a package: import it from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+import scheduler
+
+@pytest.fixture
+def problem():
+    """ Installs a small synthetic instance as the scheduler's problem and returns its sessions. """
+    random.seed(0)
+    df_subjects, df_venues, df_lecturers = benchmark.generate_instance(12, seed=0)
+    scheduler.set_venues(*scheduler.venue_tables(df_venues))
+    scheduler.set_sessions(scheduler.expand_sessions(df_subjects, df_lecturers))
+    return scheduler.expanded_subjects
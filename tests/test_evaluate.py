@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+
+import scheduler
+
+def random_gene(rnd):
+    """ Any gene at all: every day, start slot, venue and length, feasible or not. """
+    return scheduler.encode_gene(rnd.choice(scheduler.days), rnd.choice(scheduler.times),
+                                 rnd.choice(scheduler.venue_names), rnd.randint(1, 3))
+
+def random_edit(individual, rnd):
+    """ Overwrites a few genes with random ones or with copies of other genes, which clash with them. """
+    for _ in range(rnd.randint(1, 5)):
+        i = rnd.randrange(len(individual))
+        individual[i] = random_gene(rnd) if rnd.random() < 0.5 else individual[rnd.randrange(len(individual))]
+    return individual
+
+def varied_population(rnd, size=20):
+    """ Created individuals, then crossed, shuffled and randomly edited copies of them. """
+    population = scheduler.toolbox.population(n=size)
+    varied = [scheduler.toolbox.clone(ind) for ind in population]
+    for ind1, ind2 in zip(varied[::2], varied[1::2]):
+        scheduler.cx_two_point(ind1, ind2)
+    for ind in varied[:size // 2]:
+        scheduler.mut_shuffle_indexes(ind, indpb=0.2)
+    for ind in varied[size // 2:]:
+        random_edit(ind, rnd)
+    return population + varied
+
+def test_population_evaluator_matches_evaluate(problem):
+    rnd = random.Random(1)
+    for _ in range(10):
+        population = varied_population(rnd)
+        expected = [scheduler.evaluate(ind)[0] for ind in population]
+        assert scheduler.population_evaluator(population).tolist() == expected
+
+def test_population_evaluator_without_sessions(problem):
+    scheduler.set_sessions(scheduler.SessionTable())
+    population = [scheduler.creator.Individual([]) for _ in range(3)]
+    assert scheduler.population_evaluator(population).tolist() == [0, 0, 0]
+    assert all(count.tolist() == [0, 0, 0] for count in scheduler.population_evaluator.violations(population).values())
+    assert scheduler.evaluate(population[0]) == (0,)
+
+def test_incremental_matches_evaluate(problem):
+    rnd = random.Random(3)
+    population = scheduler.toolbox.population(n=10)
+    for ind in population:
+        scheduler.evaluate_incremental(ind)
+
+    for _ in range(30):
+        ind1, ind2 = (scheduler.toolbox.clone(ind) for ind in rnd.sample(population, 2))
+        variation = rnd.randrange(5)
+        if variation == 0:
+            scheduler.cx_two_point(ind1, ind2)
+        elif variation == 1:
+            scheduler.cx_two_point_repair(ind1, ind2)
+        elif variation == 2:
+            scheduler.mut_shuffle_indexes(ind1, indpb=0.1)
+            scheduler.mut_shuffle_indexes(ind2, indpb=0.1)
+        elif variation == 3:
+            scheduler.mut_reassign(ind1, indpb=0.1)
+            scheduler.mut_reassign(ind2, indpb=0.1)
+        else:
+            for ind in (ind1, ind2):
+                i = rnd.randrange(len(ind))
+                ind[i] = random_gene(rnd)
+                scheduler.mark_touched(ind, [i])
+        for ind in (ind1, ind2):
+            assert scheduler.evaluate_incremental(ind) == scheduler.evaluate(ind)
+        population[rnd.randrange(len(population))] = ind1